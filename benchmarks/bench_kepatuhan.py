@@ -0,0 +1,173 @@
+# Benchmark per tahap pipeline dengan workbook sintetis.
+#
+#   python benchmarks/bench_kepatuhan.py --rows 10000 100000 --output bench.json
+#   python benchmarks/bench_kepatuhan.py --rows 10000 --bandingkan bench_lama.json
+#
+# Hasil disimpan sebagai JSON supaya versi yang berbeda bisa dibandingkan.
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kepatuhan.ekspor import ekspor_excel  # noqa: E402
+from kepatuhan.hitung import hitung_kepatuhan, hitung_kepatuhan_multi  # noqa: E402
+from kepatuhan.kolom import konversi_kolom_bulan, normalisasi_kolom  # noqa: E402
+from kepatuhan.indeks import IndeksFilter, terapkan  # noqa: E402
+from kepatuhan.kompak import kompakkan  # noqa: E402
+from kepatuhan.kueri import KueriDuckDB  # noqa: E402
+from kepatuhan.partisi import SHARD_PER_PROSES, buat_pool, hitung_kepatuhan_partisi  # noqa: E402
+from kepatuhan.ringkasan import KubusRingkasan  # noqa: E402
+
+UNIT = [f"UPPPD {nama}" for nama in ["Barat", "Timur", "Utara", "Selatan", "Tengah", "Kota", "Pesisir", "Hulu"]]
+KLASIFIKASI = ["Hotel", "Restoran", "Hiburan", "Parkir", "Reklame", "PBJT Listrik"]
+STATUS = ["Aktif", "Tutup", "Tutup Sementara"]
+
+
+def buat_data(rows, tahun=(2023, 2024), seed=0):
+    # Frame mentah seperti hasil read_excel: header bulan masih teks dengan dua gaya
+    rng = np.random.default_rng(seed)
+    tmt = pd.Timestamp("2015-01-01") + pd.to_timedelta(rng.integers(0, 365 * 10, rows), unit="D")
+    data = {
+        "TMT": pd.Series(tmt).where(rng.random(rows) > 0.02),
+        "Nama Op": [f"OP {i:07d}" for i in rng.integers(0, max(rows // 3, 1), rows)],
+        "Nm Unit": rng.choice(UNIT, rows),
+        "KLASIFIKASI": rng.choice(KLASIFIKASI, rows),
+        "STATUS": rng.choice(STATUS, rows, p=[0.85, 0.1, 0.05]),
+    }
+    rajin = rng.random(rows)
+    for th in tahun:
+        for bulan in range(1, 13):
+            gaya = "%b-%y" if bulan % 2 else "%b %Y"
+            bayar = rng.random(rows) < rajin
+            data[pd.Timestamp(th, bulan, 1).strftime(gaya)] = np.where(bayar, rng.integers(50, 50_000, rows) * 1000, 0)
+    return pd.DataFrame(data)
+
+
+def buat_workbook(df):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        df.to_excel(writer, index=False, sheet_name="Data")
+    return output.getvalue()
+
+
+def ukur(hasil, tahap, fungsi, *args):
+    mulai = time.perf_counter()
+    keluaran = fungsi(*args)
+    hasil[tahap] = round(time.perf_counter() - mulai, 4)
+    return keluaran
+
+
+def jalankan(rows, tahun_pajak, tanpa_excel, pool=None, jumlah_proses=1, sql=False):
+    tahap = {}
+    df_mentah = buat_data(rows)
+    if tanpa_excel:
+        df = df_mentah
+    else:
+        workbook = buat_workbook(df_mentah)
+        df = ukur(tahap, "parse_excel", pd.read_excel, BytesIO(workbook))
+    df = ukur(tahap, "normalisasi_kolom", normalisasi_kolom, df)
+    df = ukur(tahap, "konversi_kolom_bulan", konversi_kolom_bulan, df)
+    df = ukur(tahap, "kompakkan", kompakkan, df)
+    df_output, payment_cols = ukur(tahap, "hitung_kepatuhan", hitung_kepatuhan, df, tahun_pajak)
+    ukur(tahap, "hitung_kepatuhan_multi", hitung_kepatuhan_multi, df)
+
+    indeks = ukur(tahap, "indeks_filter", IndeksFilter, df)
+    pilihan = {"Nm Unit": [UNIT[0]], "KLASIFIKASI": [KLASIFIKASI[0]], "STATUS": ["Aktif", "Tutup Sementara"]}
+    df_filter = ukur(tahap, "filter", lambda: terapkan(df_output, indeks.cari(pilihan)))
+
+    kubus = ukur(tahap, "kubus", KubusRingkasan, df_output, payment_cols)
+
+    def agregasi():
+        return kubus.data_pie(pilihan), kubus.tren_bulanan(pilihan), kubus.top_objek(pilihan, 5)
+    ukur(tahap, "agregasi", agregasi)
+    if sql:
+        # Mode SQL: tabel DuckDB menggantikan indeks + kubus
+        kueri = ukur(tahap, "tabel_sql", KueriDuckDB, df_output, payment_cols)
+        ukur(tahap, "filter_sql", kueri.cari, pilihan)
+
+        def agregasi_sql():
+            return kueri.data_pie(pilihan), kueri.tren_bulanan(pilihan), kueri.top_objek(pilihan, 5)
+        ukur(tahap, "agregasi_sql", agregasi_sql)
+    if pool is not None:
+        # Bandingkan dengan hitung_kepatuhan + kubus (dua tahap di atas)
+        ukur(tahap, "kepatuhan_partisi", hitung_kepatuhan_partisi, df, tahun_pajak, pool,
+             jumlah_proses * SHARD_PER_PROSES)
+    if not tanpa_excel:
+        ukur(tahap, "ekspor", ekspor_excel, df_filter)
+    return {"rows": rows, "rows_filter": len(df_filter), "tahap": tahap, "memori": df.attrs.get("laporan_dtype")}
+
+
+def versi_git():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bandingkan(hasil, path_lama):
+    lama = {r["rows"]: r["tahap"] for r in json.loads(Path(path_lama).read_text())["hasil"]}
+    for r in hasil:
+        if r["rows"] not in lama:
+            continue
+        print(f"\n{r['rows']:,} baris (lama -> baru)")
+        for nama, detik in r["tahap"].items():
+            if nama in lama[r["rows"]]:
+                sebelum = lama[r["rows"]][nama]
+                rasio = detik / sebelum if sebelum else float("nan")
+                print(f"  {nama:22s} {sebelum:9.4f}s -> {detik:9.4f}s  ({rasio:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline dashboard kepatuhan.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--tahun", type=int, default=2024)
+    parser.add_argument("--tanpa-excel", action="store_true",
+                        help="lewati parse dan ekspor Excel (berguna untuk ukuran besar)")
+    parser.add_argument("--proses", type=int, default=1,
+                        help="ukur juga hitung_kepatuhan_partisi dengan sejumlah proses ini (>1)")
+    parser.add_argument("--sql", action="store_true", help="ukur juga mode SQL (butuh duckdb)")
+    parser.add_argument("--output", type=Path, help="simpan hasil ke file JSON")
+    parser.add_argument("--bandingkan", type=Path, help="file JSON hasil sebelumnya")
+    args = parser.parse_args(argv)
+
+    pool = buat_pool(args.proses) if args.proses > 1 else None
+    if pool is not None:
+        # Start proses tidak ikut diukur
+        list(pool.map(int, range(args.proses)))
+
+    hasil = []
+    for rows in args.rows:
+        r = jalankan(rows, args.tahun, args.tanpa_excel, pool, args.proses, args.sql)
+        print(f"{rows:,} baris: " + ", ".join(f"{k}={v:.3f}s" for k, v in r["tahap"].items()))
+        hasil.append(r)
+
+    laporan = {
+        "waktu": datetime.now().isoformat(timespec="seconds"),
+        "git": versi_git(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "proses": args.proses,
+        "hasil": hasil,
+    }
+    if pool is not None:
+        pool.shutdown()
+    if args.output:
+        args.output.write_text(json.dumps(laporan, indent=2))
+    if args.bandingkan:
+        bandingkan(hasil, args.bandingkan)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+# Jalankan dengan: streamlit run dashboard_kepatuhan.py
+from kepatuhan.app import main
+
+main()
@@ -0,0 +1,21 @@
+# Dashboard kepatuhan pajak daerah.
+#
+#   kolom     - normalisasi header dan deteksi kolom bulan
+#   kompak    - optimasi dtype (blok pembayaran int64, categorical)
+#   hitung    - perhitungan kepatuhan (satu tahun atau semua tahun sekaligus)
+#   inkremental - pembaruan dari upload sebelumnya (bulan baru, objek berubah)
+#   partisi   - perhitungan paralel per Nm Unit di beberapa proses (shared memory)
+#   pemuatan  - parsing workbook (tunggal/batch) dengan cache
+#   streaming - pembacaan per chunk untuk workbook sangat besar
+#   pekerja   - pemuatan/perhitungan di thread latar (progres, pembatalan)
+#   cache     - LRU di memori dan cache Arrow di disk
+#   arsip     - arsip SQLite hasil olahan per workbook (riwayat, buka ulang tanpa upload)
+#   indeks    - indeks terbalik untuk filter sidebar
+#   ringkasan - kubus pra-agregasi untuk grafik/tabel
+#   kueri     - mode SQL opsional: filter dan agregasi sebagai kueri DuckDB
+#   grafik    - figur plotly dari kubus, di-cache per filter
+#   tabel     - tabel hasil per halaman (urut/cari di server)
+#   ekspor    - ekspor hasil ke Excel
+#   instrumen - pengukuran waktu/memori per tahap (mode debug)
+#   cli       - entry point tanpa Streamlit (python -m kepatuhan)
+#   app       - tampilan Streamlit (streamlit run dashboard_kepatuhan.py)
@@ -0,0 +1,358 @@
+# Tampilan Streamlit. Semua logika hitung ada di modul lain dalam paket ini
+# (tanpa streamlit/plotly), sehingga bisa dipakai ulang oleh CLI dan worker.
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from .arsip import arsip_aktif, daftar as daftar_arsip, simpan as simpan_arsip
+from .cache import CACHE_BERSAMA_MAX_BYTES, LRUCache, hash_file
+from .ekspor import ekspor_excel_cache
+from .grafik import figur_cache
+from .hitung import KELAS_KEPATUHAN, hitung_kepatuhan_multi_cache
+from .instrumen import Instrumen, aktifkan_log
+from .kueri import duckdb_tersedia, kueri_cache
+from .partisi import JUMLAH_PROSES, buat_pool
+from .pekerja import mulai, proses_arsip, proses_batch, proses_sheet, proses_stream
+from .pemuatan import daftar_sheet, hash_batch
+from .indeks import SEMUA, indeks_filter_cache, pilihan_dari, terapkan
+from .ringkasan import URUT_PERINGKAT, kubus_cache, ringkasan_antar_tahun
+from .tabel import UKURAN_HALAMAN, jumlah_halaman, tabel_halaman_cache
+
+
+# Frame di cache bersama dipakai banyak sesi sekaligus. Dengan Copy-on-Write (selalu aktif
+# sejak pandas 3) perubahan oleh satu sesi tidak pernah menulis ke frame milik cache.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def ambil_cache(nama, max_entries, max_bytes):
+    if nama not in st.session_state:
+        st.session_state[nama] = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+    return st.session_state[nama]
+
+
+@st.cache_resource
+def cache_bersama(nama, max_entries, max_bytes):
+    # Satu LRUCache per proses server untuk semua sesi, dikunci per key oleh LRUCache
+    return LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def minta_input(cache_sheet, cache_hasil, instrumen, tahun_pajak):
+    # Widget upload. Mengembalikan (key, kerja) untuk dijalankan di latar, atau None bila
+    # belum ada upload. kerja(tugas) mengembalikan dict konteks (lihat pekerja.py).
+    if arsip_aktif() and st.checkbox("🗄️ Buka dari arsip (tanpa upload)"):
+        return pilih_arsip(cache_sheet, cache_hasil, int(tahun_pajak))
+    mode_batch = st.checkbox("📚 Mode batch (banyak file, semua sheet)")
+    if mode_batch:
+        uploaded_files = st.file_uploader("📁 Upload File Excel", type=["xlsx"], accept_multiple_files=True)
+    else:
+        mode_stream = st.checkbox("🪶 Mode hemat memori (untuk file sangat besar)")
+        uploaded_file = st.file_uploader("📁 Upload File Excel", type=["xlsx"])
+    tahun_pajak = int(tahun_pajak)
+
+    if mode_batch and uploaded_files:
+        with instrumen.ukur("upload") as info:
+            files = [(f.name, f.getvalue()) for f in uploaded_files]
+            file_hash = hash_batch(files)
+            info["bytes"] = sum(len(data) for _, data in files)
+        return ((file_hash, None, tahun_pajak),
+                partial(proses_batch, files=files, file_hash=file_hash, tahun_pajak=tahun_pajak,
+                        cache_sheet=cache_sheet, cache_hasil=cache_hasil, pool=pool_proses()))
+    if not mode_batch and uploaded_file:
+        with instrumen.ukur("upload") as info:
+            file_bytes = uploaded_file.getvalue()
+            file_hash = hash_file(file_bytes)
+            info["bytes"] = len(file_bytes)
+        sheet_names = daftar_sheet(file_bytes, file_hash, cache_sheet)
+        selected_sheet = st.selectbox("📄 Pilih Nama Sheet", sheet_names)
+        if mode_stream:
+            return ((file_hash, (selected_sheet, "stream"), tahun_pajak),
+                    partial(proses_stream, data=file_bytes, file_hash=file_hash, sheet=selected_sheet,
+                            tahun_pajak=tahun_pajak, cache_sheet=cache_sheet))
+        return ((file_hash, selected_sheet, tahun_pajak),
+                partial(proses_sheet, data=file_bytes, file_hash=file_hash, sheet=selected_sheet,
+                        tahun_pajak=tahun_pajak, cache_sheet=cache_sheet, cache_hasil=cache_hasil,
+                        nama=uploaded_file.name))
+    return None
+
+
+def pilih_arsip(cache_sheet, cache_hasil, tahun_pajak):
+    riwayat = daftar_arsip()
+    if riwayat.empty:
+        st.info("🗄️ Arsip masih kosong. Workbook yang di-upload otomatis tersimpan di sini.")
+        return None
+    label = [f"{r.nama} [{r.sheet or 'batch'}] - diproses {r.diproses.replace('T', ' ')}, {r.baris:,} baris, "
+             f"tahun {r.tahun or '-'}" for r in riwayat.itertuples()]
+    pilihan = riwayat.iloc[st.selectbox("🗂️ Pilih workbook", range(len(riwayat)), format_func=label.__getitem__)]
+    sheet = pilihan["sheet"] or None
+    return ((pilihan["file_hash"], sheet, tahun_pajak),
+            partial(proses_arsip, file_hash=pilihan["file_hash"], sheet=sheet, tahun_pajak=tahun_pajak,
+                    nama=pilihan["nama"], cache_sheet=cache_sheet, cache_hasil=cache_hasil))
+
+
+@st.cache_resource
+def antrean_arsip():
+    # (sidik file, sheet) -> Future penyimpanan ke arsip, bersama untuk semua sesi
+    return {}
+
+
+def arsipkan(konteks):
+    # Simpan hasil upload ke arsip di thread latar; mode hemat memori tidak menyimpan
+    # kolom bulan sehingga tidak diarsipkan
+    if not arsip_aktif() or konteks["kubus"] is not None:
+        return
+    key = (konteks["file_hash"], konteks["selected_sheet"])
+    antrean = antrean_arsip()
+    if key not in antrean:
+        antrean[key] = pelaksana().submit(simpan_arsip, konteks["df_input"], *key, konteks["nama"])
+    future = antrean[key]
+    if not future.done():
+        st.caption("🗄️ Menyimpan ke arsip di latar...")
+    elif future.exception() is not None:
+        # Gagal sementara (DB terkunci, disk penuh): dibuang dari antrean supaya run berikutnya mencoba lagi
+        if antrean.get(key) is future:
+            antrean.pop(key, None)
+        st.caption(f"⚠️ Gagal menyimpan ke arsip: {future.exception()}")
+    elif not future.result():
+        st.caption("⚠️ Gagal menyimpan ke arsip: kolom tidak didukung")
+    else:
+        st.caption("🗄️ Tersimpan di arsip; bisa dibuka lagi tanpa upload")
+
+
+@st.cache_resource
+def pelaksana():
+    # Thread latar bersama untuk semua sesi; pekerjaan berat melepas GIL di pandas/numpy
+    return ThreadPoolExecutor(max_workers=max(2, os.cpu_count() or 1), thread_name_prefix="kepatuhan")
+
+
+@st.cache_resource
+def pool_proses():
+    # Proses untuk rekap batch terpartisi per Nm Unit; None bila hanya ada satu core
+    return buat_pool() if JUMLAH_PROSES > 1 else None
+
+
+@st.fragment(run_every=0.5)
+def tampilkan_progres(tugas):
+    # Dijalankan ulang tiap 0,5 detik tanpa menjalankan ulang seluruh halaman
+    if tugas.future.done():
+        st.rerun()
+    st.progress(tugas.progres, text=tugas.tahap[-1] if tugas.tahap else "⏳ Menunggu giliran...")
+    for pesan in tugas.tahap[:-1]:
+        st.caption(pesan)
+
+
+def ambil_konteks(key, kerja, instrumen):
+    # Menjalankan kerja di latar untuk key ini. Tugas lama dengan key lain dibatalkan.
+    # Selama tugas berjalan, konteks terakhir yang berhasil tetap ditampilkan.
+    tugas = st.session_state.get("tugas")
+    if tugas is not None and tugas.key != key:
+        tugas.batalkan()
+        tugas = None
+    if tugas is None:
+        tugas = mulai(pelaksana(), key, kerja, Instrumen(aktif=instrumen.aktif, sesi=instrumen.sesi))
+        st.session_state["tugas"] = tugas
+        # Hasil yang sudah ada di cache biasanya selesai seketika; tidak perlu tampilan progres
+        wait([tugas.future], timeout=0.5)
+
+    if not tugas.future.done():
+        tampilkan_progres(tugas)
+        return st.session_state.get("konteks_terakhir")
+    try:
+        konteks = tugas.future.result()
+    except ValueError as e:
+        st.error(f"❌ {e}. Harap periksa file Anda.")
+        return None
+    if st.session_state.get("konteks_terakhir") is not konteks:
+        # Catatan instrumen dari thread latar ditampilkan sekali, pada run pertama setelah selesai
+        instrumen.catatan.extend(tugas.instrumen.catatan)
+        st.session_state["konteks_terakhir"] = konteks
+    return konteks
+
+
+def filter_sidebar(df_output, indeks):
+    # Opsi tiap filter mengikuti filter di atasnya, seperti sebelumnya
+    with st.sidebar:
+        st.header("🔍 Filter Data")
+        selected_unit = st.selectbox("🏢 Pilih UPPPD", [SEMUA] + indeks.opsi("Nm Unit"))
+        pilihan = {"Nm Unit": pilihan_dari(selected_unit)}
+
+        selected_klasifikasi = st.selectbox("📂 Pilih Klasifikasi Pajak",
+                                            [SEMUA] + indeks.opsi("KLASIFIKASI", pilihan))
+        pilihan["KLASIFIKASI"] = pilihan_dari(selected_klasifikasi)
+
+        selected_status = st.multiselect("📌 Pilih Status OP", options=indeks.opsi("STATUS", pilihan))
+        pilihan["STATUS"] = selected_status
+
+    df_output = terapkan(df_output, indeks.cari(pilihan))
+    return df_output, pilihan, (selected_unit, selected_klasifikasi, tuple(selected_status))
+
+
+def tampilkan_tabel(tabel, posisi, key_filter):
+    # Hanya satu halaman yang dikirim ke browser; urut/cari/filter dihitung di server
+    kolom_cari, kolom_urut, kolom_arah, kolom_ukuran = st.columns([3, 3, 2, 2])
+    cari = kolom_cari.text_input("🔎 Cari Nama OP")
+    urut = kolom_urut.selectbox("↕️ Urutkan berdasarkan", ["(urutan file)"] + list(tabel.df.columns))
+    naik = kolom_arah.radio("Arah", ["Naik", "Turun"], horizontal=True) == "Naik"
+    ukuran = kolom_ukuran.selectbox("Baris per halaman", UKURAN_HALAMAN)
+
+    kolom_urut = None if urut == "(urutan file)" else urut
+    susunan = tabel.susun(posisi, key_filter, kolom_urut, naik, cari)
+    total_halaman = jumlah_halaman(len(susunan), ukuran)
+    # Key ikut berubah saat filter/urutan/pencarian berubah, sehingga halaman kembali ke 1
+    nomor = st.number_input(f"Halaman (dari {total_halaman:,})", min_value=1, max_value=total_halaman, value=1,
+                            key=f"halaman-{hash((key_filter, kolom_urut, naik, cari, ukuran))}")
+    awal = (nomor - 1) * ukuran
+    st.dataframe(tabel.halaman(susunan, nomor, ukuran), use_container_width=True)
+    st.caption(f"Menampilkan baris {min(awal + 1, len(susunan)):,}-{min(awal + ukuran, len(susunan)):,} "
+               f"dari {len(susunan):,}")
+
+
+def tampilkan_grafik(figur):
+    st.subheader("Pie Chart Kepatuhan WP")
+    st.plotly_chart(figur["pie"], use_container_width=True)
+
+    st.subheader("📈 Tren Pembayaran Pajak per Bulan")
+    if figur["tren"] is not None:
+        st.plotly_chart(figur["tren"], use_container_width=True)
+
+    st.subheader("📊 Sebaran Total Pembayaran per Objek")
+    st.plotly_chart(figur["sebaran"], use_container_width=True)
+
+
+def tampilkan_top(kubus, pilihan):
+    # Top-N dijawab dari array total per objek di kubus (seleksi parsial), jadi ganti N,
+    # urutan atau mode per unit tidak perlu cache figur sendiri
+    kol_n, kol_urut, kol_unit = st.columns(3)
+    n = kol_n.number_input("Jumlah objek (N)", min_value=1, max_value=100, value=5)
+    urut = kol_urut.selectbox("Peringkat menurut", URUT_PERINGKAT)
+    per_unit = kol_unit.checkbox("Per UPPPD")
+    judul = f"🏅 Top {n} Objek Pajak Berdasarkan {urut}" + (" per UPPPD" if per_unit else " (Tabel Lengkap)")
+    st.subheader(judul)
+    top = kubus.top_objek(pilihan, int(n), urut, per_unit)
+    st.dataframe(top.style.format({kolom: "Rp{:,.0f}" for kolom in URUT_PERINGKAT}), use_container_width=True)
+
+
+def tampilkan_antar_tahun(df_multi, pilihan):
+    st.subheader("📊 Perbandingan Kepatuhan Antar Tahun")
+    per_kelas, per_tahun = ringkasan_antar_tahun(df_multi, pilihan)
+    fig_bar = px.bar(per_kelas, x="Tahun", y="Jumlah", color="Klasifikasi", title="Jumlah WP per Kelas Kepatuhan",
+                     category_orders={"Klasifikasi": KELAS_KEPATUHAN},
+                     color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig_bar.update_xaxes(type="category")
+    st.plotly_chart(fig_bar, use_container_width=True)
+    st.dataframe(per_tahun.style.format({"Total Pembayaran": "Rp{:,.0f}", "Rata-rata Kepatuhan (%)": "{:.1f}"}),
+                 use_container_width=True)
+
+
+def tampilkan_debug(instrumen):
+    if instrumen.aktif and instrumen.catatan:
+        with st.expander("🐞 Debug: waktu & memori per tahap", expanded=False):
+            st.dataframe(instrumen.catatan, use_container_width=True)
+            st.caption(f"Sesi {instrumen.sesi} · total {sum(c['detik'] for c in instrumen.catatan):.3f} detik")
+            if any(c.get("puncak_perkiraan") for c in instrumen.catatan):
+                st.caption("puncak_perkiraan: tahap berjalan bersamaan dengan tahap lain (thread latar atau sesi "
+                           "lain), puncak memorinya ikut menghitung alokasi tahap itu")
+
+
+def main():
+    st.set_page_config(page_title="🎨 Dashboard Kepatuhan Pajak Daerah", layout="wide")
+    st.title("🎯 Dashboard Kepatuhan Pajak Daerah")
+    st.markdown("Upload file Excel, pilih sheet, filter, dan lihat visualisasinya ✨")
+
+    # Mode debug: aktif lewat checkbox atau env KEPATUHAN_DEBUG=1
+    debug = st.sidebar.checkbox("🐞 Mode debug", value=os.environ.get("KEPATUHAN_DEBUG") == "1")
+    if debug:
+        aktifkan_log()
+    sesi = st.session_state.setdefault("id_sesi", uuid.uuid4().hex[:8])
+    instrumen = Instrumen(aktif=debug, sesi=sesi)
+
+    jalankan_dashboard(instrumen)
+    tampilkan_debug(instrumen)
+
+
+def jalankan_dashboard(instrumen):
+    # Cache bersama semua sesi (dikunci dengan sidik isi file): sheet hasil parsing, hasil
+    # kepatuhan, kubus dan file ekspor. Cache per sesi untuk objek yang menyimpan memo
+    # (indeks filter, tabel halaman) dan figur grafik.
+    cache_sheet = cache_bersama("sheet", 32, CACHE_BERSAMA_MAX_BYTES // 2)
+    cache_hasil = cache_bersama("hasil", 64, CACHE_BERSAMA_MAX_BYTES // 2)
+    cache_sesi = ambil_cache("cache_sesi", 16, 256 * 1024 ** 2)
+    cache_grafik = ambil_cache("cache_grafik", 32, 64 * 1024 ** 2)
+
+    tahun_pajak = st.number_input("📅 Pilih Tahun Pajak", min_value=2000, max_value=2100, value=2024)
+    permintaan = minta_input(cache_sheet, cache_hasil, instrumen, tahun_pajak)
+    if permintaan is None:
+        return
+    # Parsing dan perhitungan berjalan di latar; bisa saja yang tampil masih hasil sebelumnya
+    konteks = ambil_konteks(*permintaan, instrumen)
+    if konteks is None:
+        return
+    df_input, df_hasil, payment_cols, kubus = (konteks[k] for k in ("df_input", "df_hasil", "payment_cols", "kubus"))
+    file_hash, selected_sheet, tahun_pajak = konteks["file_hash"], konteks["selected_sheet"], konteks["tahun_pajak"]
+    hasil_stream = kubus is not None
+
+    pembaruan = konteks["pembaruan"]
+    if pembaruan:
+        st.info(f"🔁 Diperbarui dari upload sebelumnya: {pembaruan['bulan_baru']} bulan baru, "
+                f"{pembaruan['baris_baru']} objek baru, {pembaruan['baris_berubah']} objek berubah, "
+                f"{pembaruan['baris_dihapus']} objek dihapus")
+    for catatan in konteks["dilewati"]:
+        st.warning(f"⚠️ {catatan}")
+    # Mode SQL: filter dan agregasi dijalankan sebagai kueri DuckDB atas tabel hasil.
+    # Jalur pandas (indeks + kubus) tetap default dan dipakai untuk membandingkan hasil.
+    kueri = None
+    if not hasil_stream and duckdb_tersedia() and st.sidebar.checkbox(
+            "🦆 Mode SQL (DuckDB)", value=os.environ.get("KEPATUHAN_SQL") == "1"):
+        with instrumen.ukur("tabel_sql") as info:
+            kueri = kueri_cache(df_hasil, payment_cols, (file_hash, selected_sheet, int(tahun_pajak)), cache_hasil)
+            info["rows"] = len(df_hasil)
+    with instrumen.ukur("filter") as info:
+        if kueri is not None:
+            indeks = kueri
+            info["sql"] = True
+        else:
+            indeks = indeks_filter_cache(df_input, (file_hash, selected_sheet), cache_sesi)
+        df_output, pilihan, filter_terpilih = filter_sidebar(df_hasil, indeks)
+        info["rows"] = len(df_output)
+
+    st.success("✅ Data berhasil diproses dan difilter!")
+    arsipkan(konteks)
+    key_ekspor = (file_hash, selected_sheet, int(tahun_pajak)) + filter_terpilih
+    with instrumen.ukur("tabel") as info:
+        tabel = tabel_halaman_cache(df_hasil, (file_hash, selected_sheet, int(tahun_pajak)), cache_sesi)
+        tampilkan_tabel(tabel, indeks.cari(pilihan), filter_terpilih)
+        info["rows"] = len(df_output)
+
+    # File Excel baru dibuat saat diminta, lalu disimpan per kombinasi filter
+    if ("ekspor",) + key_ekspor in cache_hasil or st.button("📦 Siapkan File Excel"):
+        with instrumen.ukur("ekspor") as info, st.spinner("Menyiapkan file Excel..."):
+            excel_bytes = ekspor_excel_cache(df_output, key_ekspor, cache_hasil)
+            info["bytes"] = len(excel_bytes)
+        st.download_button("⬇️ Download Hasil Excel", data=excel_bytes, file_name="hasil_dashboard.xlsx")
+
+    with instrumen.ukur("grafik") as info:
+        # Kubus dibangun sekali per (sheet, tahun); semua grafik dijawab dari situ
+        if kueri is not None:
+            kubus = kueri
+        elif kubus is None:
+            kubus = kubus_cache(df_hasil, payment_cols, (file_hash, selected_sheet, int(tahun_pajak)), cache_hasil)
+        # Figur disimpan per kombinasi filter; rerun lain (mis. klik ekspor) memakai ulang
+        figur = figur_cache(kubus, pilihan, key_ekspor + (kueri is not None,), cache_grafik)
+        tampilkan_grafik(figur)
+        tampilkan_top(kubus, pilihan)
+        if kueri is not None:
+            info["sql"] = True
+        else:
+            info["sel_kubus"] = len(kubus.sel)
+
+    # Mode hemat memori tidak menyimpan kolom bulan, jadi perbandingan antar tahun tidak tersedia
+    if not hasil_stream and st.checkbox("📊 Tampilkan perbandingan antar tahun"):
+        with instrumen.ukur("antar_tahun") as info:
+            df_multi = hitung_kepatuhan_multi_cache(df_input, (file_hash, selected_sheet), cache_hasil)
+            tampilkan_antar_tahun(df_multi, pilihan)
+            info["rows"] = len(df_multi)
@@ -0,0 +1,188 @@
+# Arsip lokal (SQLite) hasil olahan tiap workbook, supaya dashboard bulan-bulan
+# sebelumnya bisa dibuka lagi tanpa upload dan parsing Excel.
+#
+#   workbook  - satu baris per (sidik file, sheet): nama, waktu proses, jumlah baris,
+#               dan snapshot Arrow frame yang sudah dinormalisasi (untuk buka ulang)
+#   objek     - baris ternormalisasi: Nama Op, Nm Unit, KLASIFIKASI, STATUS, TMT
+#   kepatuhan - hasil per (tahun pajak, baris) untuk semua tahun di header
+#
+# Tabel objek/kepatuhan diindeks per objek, unit, klasifikasi dan tahun sehingga
+# riwayat bisa ditanya langsung dengan SQL. Buka ulang cukup membaca snapshot.
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .cache import frame_dari_arrow, tabel_arrow
+from .hitung import hitung_kepatuhan_multi
+
+VERSI_ARSIP = 1
+# Kosongkan (KEPATUHAN_ARSIP=) untuk mematikan arsip
+ARSIP_PATH = os.environ.get("KEPATUHAN_ARSIP", str(Path.home() / ".local" / "share" / "kepatuhan" / "arsip.sqlite3"))
+
+# Kolom frame -> kolom tabel objek (yang ada saja)
+KOLOM_ARSIP = {
+    "Sumber File": "sumber_file",
+    "Sumber Sheet": "sumber_sheet",
+    "Nama Op": "nama_op",
+    "Nm Unit": "nm_unit",
+    "KLASIFIKASI": "klasifikasi",
+    "STATUS": "status",
+    "TMT": "tmt",
+}
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS workbook (
+    id INTEGER PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    sheet TEXT NOT NULL,  -- '' = gabungan mode batch
+    nama TEXT NOT NULL,
+    diproses TEXT NOT NULL,
+    baris INTEGER NOT NULL,
+    tahun TEXT NOT NULL,  -- tahun pajak di header, dipisah koma
+    data BLOB NOT NULL,
+    UNIQUE (file_hash, sheet)
+);
+CREATE TABLE IF NOT EXISTS objek (
+    workbook_id INTEGER NOT NULL REFERENCES workbook (id) ON DELETE CASCADE,
+    baris INTEGER NOT NULL,
+    sumber_file TEXT,
+    sumber_sheet TEXT,
+    nama_op TEXT,
+    nm_unit TEXT,
+    klasifikasi TEXT,
+    status TEXT,
+    tmt TEXT,
+    PRIMARY KEY (workbook_id, baris)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS objek_nama ON objek (nama_op, nm_unit);
+CREATE INDEX IF NOT EXISTS objek_unit ON objek (nm_unit, klasifikasi);
+CREATE TABLE IF NOT EXISTS kepatuhan (
+    workbook_id INTEGER NOT NULL REFERENCES workbook (id) ON DELETE CASCADE,
+    tahun INTEGER NOT NULL,
+    baris INTEGER NOT NULL,
+    total_pembayaran REAL NOT NULL,
+    bulan_aktif INTEGER NOT NULL,
+    bulan_pembayaran INTEGER NOT NULL,
+    kepatuhan_persen REAL NOT NULL,
+    klasifikasi_kepatuhan TEXT NOT NULL,
+    PRIMARY KEY (workbook_id, tahun, baris)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS kepatuhan_kelas ON kepatuhan (tahun, klasifikasi_kepatuhan);
+"""
+
+
+def arsip_aktif():
+    return bool(ARSIP_PATH)
+
+
+def buka(path=None):
+    path = Path(path or ARSIP_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != VERSI_ARSIP:
+        conn.executescript(SKEMA)
+        conn.execute(f"PRAGMA user_version={VERSI_ARSIP}")
+    return conn
+
+
+def _nilai(seri):
+    # Kolom pandas -> list Python untuk sqlite (NaN/NaT -> NULL, tanggal -> teks ISO)
+    if pd.api.types.is_datetime64_any_dtype(seri):
+        seri = seri.dt.strftime("%Y-%m-%d")
+    return seri.astype(object).where(seri.notna(), None).tolist()
+
+
+def _snapshot(df):
+    import pyarrow as pa
+
+    table = tabel_arrow(df, versi=VERSI_ARSIP)
+    if table is None:
+        return None
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def simpan(df_input, file_hash, sheet, nama, ganti=False, path=None):
+    # Simpan satu workbook/sheet; df_input: frame hasil muat_sheet/muat_batch. Yang sudah
+    # ada di arsip dilewati kecuali ganti=True. Mengembalikan True bila tersimpan (atau
+    # sudah ada), False bila frame tidak bisa disnapshot.
+    if not ganti and ada(file_hash, sheet, path):
+        return True
+    data = _snapshot(df_input)
+    if data is None:
+        return False
+    df_multi = hitung_kepatuhan_multi(df_input)
+    daftar_tahun = sorted(df_multi["Tahun"].unique().tolist()) if len(df_multi) else []
+    n = len(df_input)
+
+    with closing(buka(path)) as conn, conn:
+        conn.execute("DELETE FROM workbook WHERE file_hash = ? AND sheet = ?", (file_hash, sheet or ""))
+        workbook_id = conn.execute(
+            "INSERT INTO workbook (file_hash, sheet, nama, diproses, baris, tahun, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_hash, sheet or "", nama, datetime.now().isoformat(timespec="seconds"), n,
+             ",".join(map(str, daftar_tahun)), data),
+        ).lastrowid
+
+        kolom = [col for col in KOLOM_ARSIP if col in df_input.columns]
+        conn.executemany(
+            f"INSERT INTO objek (workbook_id, baris, {', '.join(KOLOM_ARSIP[col] for col in kolom)}) "
+            f"VALUES (?, ?{', ?' * len(kolom)})",
+            zip([workbook_id] * n, range(n), *(_nilai(df_input[col]) for col in kolom)),
+        )
+        # df_multi berurutan tahun lalu baris (lihat hitung_kepatuhan_multi)
+        conn.executemany(
+            "INSERT INTO kepatuhan VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip([workbook_id] * len(df_multi), df_multi["Tahun"].tolist(),
+                np.tile(np.arange(n), len(daftar_tahun)).tolist(),
+                df_multi["Total Pembayaran"].tolist(), df_multi["bulan_aktif"].tolist(),
+                df_multi["bulan_pembayaran"].tolist(), df_multi["Kepatuhan (%)"].tolist(),
+                df_multi["Klasifikasi Kepatuhan"].astype(str).tolist()),
+        )
+    return True
+
+
+def daftar(path=None):
+    # Riwayat workbook di arsip, terbaru dulu (sheet '' = gabungan mode batch)
+    if not Path(path or ARSIP_PATH).exists():
+        return pd.DataFrame(columns=["file_hash", "sheet", "nama", "diproses", "baris", "tahun"])
+    with closing(buka(path)) as conn:
+        return pd.read_sql_query(
+            "SELECT file_hash, sheet, nama, diproses, baris, tahun FROM workbook ORDER BY diproses DESC, id DESC", conn)
+
+
+def ada(file_hash, sheet, path=None):
+    if not Path(path or ARSIP_PATH).exists():
+        return False
+    with closing(buka(path)) as conn:
+        return conn.execute("SELECT 1 FROM workbook WHERE file_hash = ? AND sheet = ?",
+                            (file_hash, sheet or "")).fetchone() is not None
+
+
+def muat(file_hash, sheet, path=None):
+    # Frame ternormalisasi seperti saat diproses, atau None bila tidak ada di arsip
+    import pyarrow as pa
+
+    if not Path(path or ARSIP_PATH).exists():
+        return None
+    with closing(buka(path)) as conn:
+        baris = conn.execute("SELECT data FROM workbook WHERE file_hash = ? AND sheet = ?",
+                             (file_hash, sheet or "")).fetchone()
+    if baris is None:
+        return None
+    return frame_dari_arrow(pa.ipc.open_stream(pa.py_buffer(baris[0])).read_all())
+
+
+def muat_cache(file_hash, sheet, cache, path=None):
+    # Disimpan di key yang sama dengan muat_sheet/muat_batch_cache, jadi sisa pipeline
+    # (kepatuhan, kubus, filter) memakai cache yang sama seperti upload biasa
+    key = ("sheet", file_hash, sheet) if sheet is not None else ("batch", file_hash)
+    return cache.ambil_atau_buat(key, lambda: muat(file_hash, sheet, path))
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+
+def hash_file(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def ukuran_objek(obj):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, tuple):
+        return sum(ukuran_objek(item) for item in obj)
+    return int(getattr(obj, "nbytes", 0))
+
+
+class LRUCache:
+    # Cache LRU dengan batas jumlah entri dan batas memori (byte).
+    # Entri paling lama tidak dipakai dibuang lebih dulu. Aman dipakai dari banyak
+    # thread (satu cache bisa dibagi semua sesi Streamlit dalam satu proses).
+    def __init__(self, max_entries=8, max_bytes=1024 ** 3):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._ukuran = {}
+        self._lock = threading.RLock()
+        self._sedang_dibuat = {}
+        self.total_bytes = 0
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        ukuran = ukuran_objek(value)
+        with self._lock:
+            if key in self._data:
+                self.pop(key)
+            self._data[key] = value
+            self._ukuran[key] = ukuran
+            self.total_bytes += ukuran
+            self._buang()
+
+    def ambil_atau_buat(self, key, buat):
+        # get, atau buat() lalu put. Bila beberapa thread meminta key yang sama bersamaan
+        # (mis. banyak pengguna meng-upload workbook yang sama), hanya satu yang menghitung;
+        # yang lain menunggu lalu memakai hasilnya.
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            kunci = self._sedang_dibuat.setdefault(key, threading.Lock())
+        try:
+            with kunci:
+                value = self.get(key)
+                if value is None:
+                    value = buat()
+                    self.put(key, value)
+        finally:
+            with self._lock:
+                self._sedang_dibuat.pop(key, None)
+        return value
+
+    def pop(self, key):
+        with self._lock:
+            value = self._data.pop(key)
+            self.total_bytes -= self._ukuran.pop(key)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._ukuran.clear()
+            self.total_bytes = 0
+
+    def _buang(self):
+        # Entri terbaru selalu dipertahankan walaupun melebihi batas memori sendirian
+        while len(self._data) > 1 and (len(self._data) > self.max_entries or self.total_bytes > self.max_bytes):
+            self.pop(next(iter(self._data)))
+
+
+# Batas cache bersama (satu per proses server, dipakai semua sesi); dibagi dua
+# antara sheet hasil parsing dan hasil hitung/ekspor.
+CACHE_BERSAMA_MAX_BYTES = int(os.environ.get("KEPATUHAN_CACHE_BERSAMA_MAX_BYTES", 2 * 1024 ** 3))
+
+
+# Cache Arrow di disk untuk sheet yang sudah dinormalisasi. Naikkan VERSI_CACHE
+# setiap kali normalisasi_kolom/konversi_kolom_bulan berubah supaya entri lama
+# otomatis dianggap basi.
+VERSI_CACHE = "6"
+CACHE_DIR = Path(os.environ.get("KEPATUHAN_CACHE_DIR", Path.home() / ".cache" / "kepatuhan"))
+CACHE_MAX_BYTES = int(os.environ.get("KEPATUHAN_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+
+def path_cache_disk(file_hash, sheet_name):
+    sheet_hash = hashlib.sha1(str(sheet_name).encode()).hexdigest()[:12]
+    return CACHE_DIR / f"{file_hash}_{sheet_hash}.arrow"
+
+
+def baca_cache_disk(file_hash, sheet_name):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    path = path_cache_disk(file_hash, sheet_name)
+    if not path.exists():
+        return None
+    try:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        meta = json.loads(table.schema.metadata[b"kepatuhan"])
+        if meta["versi"] != VERSI_CACHE or meta["sheet"] != str(sheet_name):
+            path.unlink(missing_ok=True)
+            return None
+        df = frame_dari_arrow(table)
+    except (OSError, KeyError, ValueError, pa.ArrowException):
+        path.unlink(missing_ok=True)
+        return None
+    os.utime(path)
+    return df
+
+
+def tabel_arrow(df, **meta):
+    # Arrow butuh nama kolom string; kolom bulan dicatat di metadata untuk dipulihkan.
+    # None bila frame tidak bisa dikonversi (mis. kolom duplikat atau objek bertipe campuran).
+    import pyarrow as pa
+
+    kolom_bulan = [i for i, col in enumerate(df.columns) if isinstance(col, datetime)]
+    df = df.set_axis([col.isoformat() if isinstance(col, datetime) else str(col) for col in df.columns], axis=1)
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (TypeError, ValueError, pa.ArrowException):
+        return None
+    meta = {**meta, "kolom_bulan": kolom_bulan}
+    return table.replace_schema_metadata({**(table.schema.metadata or {}), b"kepatuhan": json.dumps(meta)})
+
+
+def frame_dari_arrow(table):
+    meta = json.loads(table.schema.metadata[b"kepatuhan"])
+    df = table.to_pandas()
+    df.columns = [pd.Timestamp(col) if i in meta["kolom_bulan"] else col for i, col in enumerate(df.columns)]
+    return df
+
+
+def tulis_cache_disk(df, file_hash, sheet_name):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return
+    table = tabel_arrow(df, versi=VERSI_CACHE, sheet=str(sheet_name))
+    if table is None:
+        return
+
+    path = path_cache_disk(file_hash, sheet_name)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        bersihkan_cache_disk()
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def bersihkan_cache_disk(max_bytes=None):
+    # Buang file yang paling lama tidak dipakai sampai total ukuran di bawah batas
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    files = sorted(CACHE_DIR.glob("*.arrow"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    for path in files[:-1]:
+        if total <= max_bytes:
+            break
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
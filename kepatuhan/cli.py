@@ -0,0 +1,125 @@
+# Jalankan perhitungan kepatuhan tanpa Streamlit, mis. untuk cron malam:
+#   python -m kepatuhan data/ --tahun 2024 2025 --output hasil/
+#   python -m kepatuhan data/ --semua-tahun   (satu tabel tahun x objek per sheet)
+#
+# pandas dan modul hitung baru di-import di dalam fungsi, supaya --help dan
+# start-up proses worker tidak membayar biaya import yang tidak perlu.
+import argparse
+import sys
+from pathlib import Path
+
+
+def cari_workbook(paths):
+    hasil = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            hasil.extend(sorted(p for p in path.glob("*.xlsx") if not p.name.startswith("~$")))
+        else:
+            hasil.append(path)
+    return hasil
+
+
+def simpan(df, path, fmt):
+    from .ekspor import ekspor_excel
+
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        path.write_bytes(ekspor_excel(df))
+
+
+def proses_file(path, daftar_tahun, output_dir, fmt):
+    from io import BytesIO
+
+    import pandas as pd
+
+    from .cache import hash_file
+    from .hitung import hitung_kepatuhan, hitung_kepatuhan_multi
+    from .kolom import REQUIRED_COLS
+    from .pemuatan import muat_sheet_disk
+
+    laporan = []
+    data = path.read_bytes()
+    file_hash = hash_file(data)
+    for sheet_name in pd.ExcelFile(BytesIO(data)).sheet_names:
+        df = muat_sheet_disk(data, file_hash, sheet_name)
+        missing_cols = [col for col in REQUIRED_COLS if col not in df.columns]
+        if missing_cols:
+            laporan.append(f"{path.name} [{sheet_name}]: dilewati, kolom wajib hilang: {', '.join(missing_cols)}")
+            continue
+        if daftar_tahun is None:
+            # --semua-tahun: semua tahun di header dihitung sekali jalan
+            df_multi = hitung_kepatuhan_multi(df)
+            tujuan = output_dir / f"{path.stem}_{sheet_name}_semua_tahun.{fmt}"
+            simpan(df_multi, tujuan, fmt)
+            laporan.append(f"{path.name} [{sheet_name}] {df_multi['Tahun'].nunique()} tahun: "
+                           f"{len(df_multi)} baris -> {tujuan}")
+            continue
+        for tahun_pajak in daftar_tahun:
+            df_output, payment_cols = hitung_kepatuhan(df.copy(deep=False), tahun_pajak)
+            tujuan = output_dir / f"{path.stem}_{sheet_name}_{tahun_pajak}.{fmt}"
+            simpan(df_output, tujuan, fmt)
+            laporan.append(f"{path.name} [{sheet_name}] {tahun_pajak}: {len(df_output)} baris, "
+                           f"{len(payment_cols)} bulan -> {tujuan}")
+    return laporan
+
+
+def proses_file_streaming(path, daftar_tahun, output_dir, fmt):
+    # Untuk workbook sangat besar: tanpa cache disk, kolom bulan tidak ikut ditulis
+    import pandas as pd
+
+    from .streaming import muat_streaming
+
+    laporan = []
+    for sheet_name in pd.ExcelFile(path).sheet_names:
+        for tahun_pajak in daftar_tahun:
+            try:
+                df_ringkas, payment_cols, _ = muat_streaming(path, sheet_name, tahun_pajak)
+            except ValueError as e:
+                laporan.append(f"{path.name} [{sheet_name}]: dilewati, {str(e)[0].lower()}{str(e)[1:]}")
+                break
+            tujuan = output_dir / f"{path.stem}_{sheet_name}_{tahun_pajak}.{fmt}"
+            simpan(df_ringkas, tujuan, fmt)
+            laporan.append(f"{path.name} [{sheet_name}] {tahun_pajak}: {len(df_ringkas)} baris, "
+                           f"{len(payment_cols)} bulan -> {tujuan}")
+    return laporan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hitung kepatuhan pajak daerah dari workbook Excel.")
+    parser.add_argument("input", nargs="+", help="file .xlsx atau folder berisi file .xlsx")
+    parser.add_argument("--tahun", type=int, nargs="+", help="tahun pajak")
+    parser.add_argument("--semua-tahun", action="store_true",
+                        help="hitung semua tahun di header sekaligus, satu tabel per sheet")
+    parser.add_argument("--output", type=Path, default=Path("hasil"), help="folder hasil (default: hasil)")
+    parser.add_argument("--format", choices=["xlsx", "csv"], default="xlsx")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="jumlah file yang diproses paralel (satu proses per file)")
+    parser.add_argument("--streaming", action="store_true",
+                        help="baca per chunk dengan memori terbatas (untuk file sangat besar)")
+    args = parser.parse_args(argv)
+    if not args.tahun and not args.semua_tahun:
+        parser.error("isi --tahun atau gunakan --semua-tahun")
+    if args.semua_tahun and args.streaming:
+        parser.error("--semua-tahun belum didukung bersama --streaming")
+
+    files = cari_workbook(args.input)
+    if not files:
+        parser.error("tidak ada file .xlsx yang ditemukan")
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    gagal = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        proses = proses_file_streaming if args.streaming else proses_file
+        tahun = None if args.semua_tahun else args.tahun
+        futures = {path: pool.submit(proses, path, tahun, args.output, args.format) for path in files}
+        for path, future in futures.items():
+            try:
+                for baris in future.result():
+                    print(baris)
+            except Exception as e:
+                gagal += 1
+                print(f"{path.name}: gagal diproses: {e}", file=sys.stderr)
+    return 1 if gagal else 0
@@ -0,0 +1,41 @@
+from io import BytesIO
+
+from .kolom import label_kolom
+
+# Baris per potongan: nilai Python (objek) hanya dibuat untuk satu potongan sekaligus
+BARIS_PER_POTONGAN = 10_000
+
+
+def _baris(potongan):
+    kolom = []
+    for _, series in potongan.items():
+        nilai = series.astype(object)
+        kolom.append(nilai.where(series.notna(), None).tolist())
+    return zip(*kolom)
+
+
+def ekspor_excel(df):
+    # xlsxwriter mode constant_memory hanya menerima penulisan baris demi baris,
+    # sedangkan DataFrame.to_excel menulis per kolom; jadi baris ditulis sendiri.
+    import xlsxwriter
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+    })
+    worksheet = workbook.add_worksheet()
+    worksheet.write_row(0, 0, [label_kolom(col) for col in df.columns])
+
+    for awal in range(0, len(df), BARIS_PER_POTONGAN):
+        potongan = df.iloc[awal:awal + BARIS_PER_POTONGAN]
+        for i, baris in enumerate(_baris(potongan), start=awal + 1):
+            worksheet.write_row(i, 0, baris)
+
+    workbook.close()
+    return output.getvalue()
+
+
+def ekspor_excel_cache(df, key, cache):
+    key = ("ekspor",) + tuple(key)
+    return cache.ambil_atau_buat(key, lambda: ekspor_excel(df))
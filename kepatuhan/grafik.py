@@ -0,0 +1,45 @@
+# Figur plotly untuk dashboard. Semuanya dibangun dari kubus
+# pra-agregasi (bukan dari frame hasil), dan disimpan per (sheet, tahun, filter)
+# sehingga rerun Streamlit tanpa perubahan filter tidak membangun ulang figur.
+import plotly.express as px
+
+
+def rupiah_singkat(nilai):
+    for batas, satuan in ((1e12, "T"), (1e9, "M"), (1e6, "jt"), (1e3, "rb")):
+        if nilai >= batas:
+            return f"Rp{nilai / batas:,.1f} {satuan}"
+    return f"Rp{nilai:,.0f}"
+
+
+def figur_pie(kubus, pilihan):
+    return px.pie(kubus.data_pie(pilihan), names="Klasifikasi", values="Jumlah", title="Distribusi Kepatuhan WP",
+                  color_discrete_sequence=px.colors.qualitative.Pastel)
+
+
+def figur_tren(kubus, pilihan):
+    if not kubus.payment_cols:
+        return None
+    return px.line(kubus.tren_bulanan(pilihan), x="Bulan", y="Total Pembayaran",
+                   title="Total Pembayaran Pajak per Bulan", markers=True,
+                   line_shape="spline", color_discrete_sequence=["#FFB6C1"])
+
+
+def figur_sebaran(kubus, pilihan):
+    sebaran, tanpa_bayar = kubus.sebaran_total(pilihan)
+    sebaran["Rentang"] = [f"{rupiah_singkat(a)} - {rupiah_singkat(b)}"
+                          for a, b in zip(sebaran["Batas Bawah"], sebaran["Batas Atas"])]
+    judul = "Jumlah Objek per Rentang Total Pembayaran"
+    if tanpa_bayar:
+        judul += f" ({tanpa_bayar:,} objek tanpa pembayaran tidak ditampilkan)"
+    fig = px.bar(sebaran, x="Rentang", y="Jumlah Objek", title=judul,
+                 color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig.update_xaxes(title=None, tickangle=-45)
+    return fig
+
+
+def figur_cache(kubus, pilihan, key, cache):
+    key = ("grafik",) + tuple(key)
+    return cache.ambil_atau_buat(key, lambda: {
+        "pie": figur_pie(kubus, pilihan), "tren": figur_tren(kubus, pilihan),
+        "sebaran": figur_sebaran(kubus, pilihan),
+    })
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+from .kolom import kolom_pembayaran, peta_bulan
+
+KELAS_KEPATUHAN = ["Patuh", "Kurang Patuh", "Tidak Patuh", "Belum Aktif"]
+
+# Kolom identitas objek yang dibawa ke tabel multi-tahun (yang ada saja)
+KOLOM_OBJEK_MULTI = ["Sumber File", "Sumber Sheet", "Nama Op", "Nm Unit", "KLASIFIKASI", "STATUS"]
+
+
+def hitung_bulan_aktif(tmt, tahun_pajak):
+    # Jumlah bulan wajib bayar dalam tahun pajak, dihitung dari TMT (vektor).
+    # Bila tahun_pajak berupa array, hasilnya matriks baris x tahun.
+    tahun = tmt.dt.year.to_numpy(dtype=np.float64, na_value=np.nan)
+    bulan = tmt.dt.month.to_numpy(dtype=np.float64, na_value=np.nan)
+    return bulan_aktif_dari(tahun, bulan, tahun_pajak)
+
+
+def bulan_aktif_dari(tahun, bulan, tahun_pajak):
+    # Seperti hitung_bulan_aktif, dari array tahun/bulan TMT (float, NaN = kosong)
+    if np.ndim(tahun_pajak):
+        tahun, bulan = tahun[:, None], bulan[:, None]
+        tahun_pajak = np.asarray(tahun_pajak)[None, :]
+    kosong = np.isnan(tahun)
+    return np.select(
+        np.broadcast_arrays(kosong, tahun < tahun_pajak, tahun > tahun_pajak),
+        [0, 12, 0],
+        default=np.broadcast_to(12 - bulan + 1, np.broadcast(kosong, tahun_pajak).shape),
+    ).astype(np.int64)
+
+
+def kode_kepatuhan(bulan_aktif, bulan_pembayaran):
+    # Kode kategori (indeks KELAS_KEPATUHAN) per baris
+    return np.select(
+        [
+            (bulan_aktif == 0) & (bulan_pembayaran == 0),
+            bulan_pembayaran == bulan_aktif,
+            bulan_aktif - bulan_pembayaran <= 3,
+        ],
+        [3, 0, 1],
+        default=2,
+    ).astype(np.int8)
+
+
+def klasifikasi_kepatuhan(bulan_aktif, bulan_pembayaran):
+    # Dipilih langsung sebagai kode kategori, tanpa array teks
+    return pd.Categorical.from_codes(kode_kepatuhan(bulan_aktif, bulan_pembayaran), categories=KELAS_KEPATUHAN)
+
+
+def matriks_pembayaran(df, payment_cols):
+    matriks = df[payment_cols].to_numpy()
+    if matriks.dtype.kind not in "iuf":
+        matriks = df[payment_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+    return matriks
+
+
+def hitung_kepatuhan(df, tahun_pajak):
+    df['TMT'] = pd.to_datetime(df['TMT'], errors='coerce')
+    payment_cols = kolom_pembayaran(df, tahun_pajak)
+
+    matriks = matriks_pembayaran(df, payment_cols)
+    if matriks.dtype.kind == "f":
+        total_pembayaran = np.nansum(matriks, axis=1)
+    else:
+        total_pembayaran = matriks.sum(axis=1)
+
+    bulan_aktif = hitung_bulan_aktif(df['TMT'], tahun_pajak)
+    bulan_pembayaran = (matriks > 0).sum(axis=1)
+    rata_rata_pembayaran = total_pembayaran / np.where(bulan_pembayaran == 0, 1, bulan_pembayaran)
+    kepatuhan_persen = bulan_pembayaran / np.where(bulan_aktif == 0, 1, bulan_aktif) * 100
+
+    df["Total Pembayaran"] = total_pembayaran
+    df["bulan_aktif"] = bulan_aktif
+    df["bulan_pembayaran"] = bulan_pembayaran
+    df["Rata-rata Pembayaran"] = rata_rata_pembayaran
+    df["Kepatuhan (%)"] = kepatuhan_persen
+    df["Klasifikasi Kepatuhan"] = klasifikasi_kepatuhan(bulan_aktif, bulan_pembayaran)
+
+    return df, payment_cols
+
+
+def hitung_kepatuhan_multi(df):
+    # Semua tahun yang ada di header bulan dihitung sekaligus dari satu matriks
+    # pembayaran. Hasilnya tabel rapi: satu baris per (tahun, objek).
+    peta = peta_bulan(tuple(df.columns))
+    daftar_tahun = sorted(peta)
+    kolom_objek = [col for col in KOLOM_OBJEK_MULTI if col in df.columns]
+    if not daftar_tahun:
+        return pd.DataFrame(columns=["Tahun"] + kolom_objek)
+
+    # Kolom diurutkan per tahun agar total per tahun bisa diambil dengan reduceat
+    payment_cols = [col for tahun in daftar_tahun for col in peta[tahun]]
+    awal = np.cumsum([0] + [len(peta[tahun]) for tahun in daftar_tahun[:-1]])
+    matriks = matriks_pembayaran(df, payment_cols)
+    bayar = (matriks > 0).astype(np.int64)
+    if matriks.dtype.kind == "f":
+        matriks = np.nan_to_num(matriks, nan=0.0)
+    total_pembayaran = np.add.reduceat(matriks, awal, axis=1)
+    bulan_pembayaran = np.add.reduceat(bayar, awal, axis=1)
+
+    bulan_aktif = hitung_bulan_aktif(pd.to_datetime(df["TMT"], errors="coerce"), daftar_tahun)
+    rata_rata_pembayaran = total_pembayaran / np.where(bulan_pembayaran == 0, 1, bulan_pembayaran)
+    kepatuhan_persen = bulan_pembayaran / np.where(bulan_aktif == 0, 1, bulan_aktif) * 100
+
+    # Urutan baris: tahun pertama untuk semua objek, lalu tahun berikutnya (ravel kolom-mayor)
+    n = len(df)
+    hasil = df[kolom_objek].iloc[np.tile(np.arange(n), len(daftar_tahun))].reset_index(drop=True)
+    hasil.insert(0, "Tahun", np.repeat(daftar_tahun, n))
+    hasil["Total Pembayaran"] = total_pembayaran.ravel(order="F")
+    hasil["bulan_aktif"] = bulan_aktif.ravel(order="F")
+    hasil["bulan_pembayaran"] = bulan_pembayaran.ravel(order="F")
+    hasil["Rata-rata Pembayaran"] = rata_rata_pembayaran.ravel(order="F")
+    hasil["Kepatuhan (%)"] = kepatuhan_persen.ravel(order="F")
+    hasil["Klasifikasi Kepatuhan"] = klasifikasi_kepatuhan(hasil["bulan_aktif"].to_numpy(),
+                                                           hasil["bulan_pembayaran"].to_numpy())
+    return hasil
+
+
+def hitung_kepatuhan_multi_cache(df, sheet_key, cache):
+    key = ("kepatuhan_multi", sheet_key)
+    return cache.ambil_atau_buat(key, lambda: hitung_kepatuhan_multi(df))
+
+
+def hitung_kepatuhan_cache(df, sheet_key, tahun_pajak, cache):
+    # Memo hasil per (sidik sheet, tahun pajak). Salinan dangkal cukup karena
+    # hitung_kepatuhan hanya mengganti/menambah kolom, tidak menulis ke data asli.
+    key = ("kepatuhan", sheet_key, int(tahun_pajak))
+    return cache.ambil_atau_buat(key, lambda: hitung_kepatuhan(df.copy(deep=False), int(tahun_pajak)))
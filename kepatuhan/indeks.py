@@ -0,0 +1,86 @@
+# Indeks terbalik untuk filter sidebar: kategori -> posisi baris (array terurut).
+# Kombinasi filter diselesaikan dengan irisan himpunan posisi, bukan memindai
+# seluruh frame dengan boolean mask.
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+
+SEMUA = "Semua"
+KOLOM_FILTER = ["Nm Unit", "KLASIFIKASI", "STATUS"]
+
+KOSONG = np.empty(0, dtype=np.intp)
+
+
+def pilihan_dari(nilai):
+    # Nilai selectbox -> daftar nilai filter; daftar kosong berarti tanpa filter
+    if nilai == SEMUA:
+        return []
+    return [nilai]
+
+
+class IndeksFilter:
+    def __init__(self, df, kolom=KOLOM_FILTER, max_memo=64):
+        self.n = len(df)
+        self._kode = {}
+        self._kategori = {}
+        self._opsi = {}
+        self._posisi = {}
+        self._memo = LRUCache(max_entries=max_memo)
+        for k in kolom:
+            seri = df[k] if isinstance(df[k].dtype, pd.CategoricalDtype) else df[k].astype("category")
+            kategori = list(seri.cat.categories)
+            kode = seri.cat.codes.to_numpy()
+            urutan = np.argsort(kode, kind="stable")
+            # kode -1 (NaN) berada di awal urutan dan tidak masuk indeks mana pun
+            batas = np.searchsorted(kode[urutan], np.arange(len(kategori) + 1))
+            self._kode[k] = kode
+            self._kategori[k] = kategori
+            self._posisi[k] = {nilai: urutan[batas[i]:batas[i + 1]] for i, nilai in enumerate(kategori)}
+            try:
+                self._opsi[k] = sorted(kategori)
+            except TypeError:
+                self._opsi[k] = sorted(kategori, key=str)
+
+    @property
+    def nbytes(self):
+        return sum(kode.nbytes * 2 for kode in self._kode.values())
+
+    def opsi(self, kolom, pilihan=None):
+        # Daftar pilihan untuk kolom; bila pilihan (filter di atasnya) diberikan, hanya
+        # kategori yang muncul di baris yang lolos filter itu
+        posisi = self.cari(pilihan) if pilihan else None
+        if posisi is None:
+            return self._opsi[kolom]
+        kode = np.unique(self._kode[kolom][posisi])
+        ada = {self._kategori[kolom][i] for i in kode if i >= 0}
+        return [nilai for nilai in self._opsi[kolom] if nilai in ada]
+
+    def cari(self, pilihan):
+        # pilihan: {kolom: [nilai, ...]}. None berarti semua baris lolos.
+        key = tuple((kolom, tuple(nilai)) for kolom, nilai in pilihan.items() if nilai)
+        if not key:
+            return None
+        return self._memo.ambil_atau_buat(key, lambda: self._irisan(key))
+
+    def _irisan(self, key):
+        himpunan = []
+        for kolom, nilai in key:
+            bagian = [self._posisi[kolom].get(v, KOSONG) for v in nilai]
+            himpunan.append(bagian[0] if len(bagian) == 1 else np.sort(np.concatenate(bagian)))
+        himpunan.sort(key=len)
+        posisi = himpunan[0]
+        for lain in himpunan[1:]:
+            posisi = np.intersect1d(posisi, lain, assume_unique=True)
+        return posisi
+
+
+def terapkan(df, posisi):
+    if posisi is None:
+        return df
+    return df.iloc[posisi]
+
+
+def indeks_filter_cache(df, sheet_key, cache):
+    key = ("indeks", sheet_key)
+    return cache.ambil_atau_buat(key, lambda: IndeksFilter(df))
@@ -0,0 +1,150 @@
+# Pembaruan bulanan: workbook yang sama datang lagi dengan satu kolom bulan baru.
+# Versi baru dibandingkan dengan hasil versi sebelumnya per objek (Nama Op + Nm Unit)
+# dan per kolom bulan. Baris yang tidak berubah cukup ditambah kolom bulan baru;
+# hanya baris yang berubah atau baru yang dihitung ulang penuh.
+import numpy as np
+import pandas as pd
+
+from .hitung import hitung_kepatuhan, hitung_kepatuhan_cache, klasifikasi_kepatuhan, matriks_pembayaran
+from .indeks import KOLOM_FILTER
+from .kolom import kolom_pembayaran
+
+KOLOM_KUNCI = ["Sumber File", "Sumber Sheet", "Nama Op", "Nm Unit"]
+
+# Bila porsi baris berubah/baru di atas ini, hitung penuh lebih murah
+BATAS_BERUBAH = 0.5
+
+
+def _kode_sama(baru, lama):
+    return (
+        isinstance(baru.dtype, pd.CategoricalDtype)
+        and isinstance(lama.dtype, pd.CategoricalDtype)
+        and baru.cat.categories.equals(lama.cat.categories)
+        and np.array_equal(baru.cat.codes.to_numpy(), lama.cat.codes.to_numpy())
+    )
+
+
+def _posisi_lama(df_baru, df_lama, kolom):
+    # Posisi baris lama untuk tiap baris baru (-1 = objek baru), atau None bila kunci ganda.
+    # Jalur cepat (kasus umum upload bulanan): urutan dan kategori kunci sama -> slice(None).
+    if len(df_baru) == len(df_lama) and all(_kode_sama(df_baru[col], df_lama[col]) for col in kolom):
+        return slice(None)
+    kunci_baru = pd.MultiIndex.from_arrays([df_baru[col] for col in kolom])
+    kunci_lama = pd.MultiIndex.from_arrays([df_lama[col] for col in kolom])
+    if kunci_baru.has_duplicates or kunci_lama.has_duplicates:
+        return None
+    return kunci_lama.get_indexer(kunci_baru)
+
+
+def _beda(baru, lama):
+    # Per baris: True bila nilai berbeda; NaN/NaT di kedua sisi dianggap sama.
+    # Blok yang identik (kasus umum) dikenali dulu dengan satu perbandingan memori.
+    if baru.shape == lama.shape and baru.dtype == lama.dtype and baru.dtype.kind in "iumM":
+        if np.array_equal(baru, lama):
+            return np.zeros(len(baru), dtype=bool)
+    sama = (baru == lama) | (pd.isna(baru) & pd.isna(lama))
+    return ~sama.all(axis=1) if sama.ndim == 2 else ~sama
+
+
+def _nilai(baru, lama):
+    # Categorical dengan kategori yang sama cukup dibandingkan kodenya; selain itu lewat nilainya
+    if all(isinstance(seri.dtype, pd.CategoricalDtype) for seri in (baru, lama)):
+        if baru.cat.categories.equals(lama.cat.categories):
+            return baru.cat.codes.to_numpy(), lama.cat.codes.to_numpy()
+        return baru.to_numpy(dtype=object), lama.to_numpy(dtype=object)
+    return baru.to_numpy(), lama.to_numpy()
+
+
+def perbarui_kepatuhan(df_lama, cols_lama, df_baru, tahun_pajak):
+    # df_lama/cols_lama: hasil hitung_kepatuhan versi sebelumnya. Mengembalikan
+    # (df_hasil, payment_cols, info) atau None bila harus dihitung penuh.
+    payment_cols = kolom_pembayaran(df_baru, tahun_pajak)
+    kolom_tambah = [col for col in payment_cols if col not in cols_lama]
+    if len(kolom_tambah) + len(cols_lama) != len(payment_cols):
+        return None  # ada kolom bulan yang hilang
+
+    posisi = _posisi_lama(df_baru, df_lama, [col for col in KOLOM_KUNCI if col in df_baru.columns])
+    if posisi is None:
+        return None
+    if isinstance(posisi, slice):
+        idx_ada = pos_ada = posisi
+        ada = np.ones(len(df_baru), dtype=bool)
+    else:
+        ada = posisi >= 0
+        idx_ada, pos_ada = np.flatnonzero(ada), posisi[ada]
+
+    # Baris lama yang TMT, kolom filter atau pembayaran lamanya berubah
+    tmt_baru = pd.to_datetime(df_baru["TMT"], errors="coerce")
+    berubah = _beda(tmt_baru.to_numpy()[idx_ada], df_lama["TMT"].to_numpy()[pos_ada])
+    for col in KOLOM_FILTER:
+        nilai_baru, nilai_lama = _nilai(df_baru[col], df_lama[col])
+        berubah |= _beda(nilai_baru[idx_ada], nilai_lama[pos_ada])
+    if cols_lama:
+        berubah |= _beda(matriks_pembayaran(df_baru, cols_lama)[idx_ada],
+                         matriks_pembayaran(df_lama, cols_lama)[pos_ada])
+    hitung_ulang = ~ada
+    hitung_ulang[np.flatnonzero(ada)[berubah]] = True
+    if hitung_ulang.mean() > BATAS_BERUBAH:
+        return None
+
+    # Baris tetap: hasil lama + kolom bulan baru
+    n = len(df_baru)
+    total = np.zeros(n, dtype=df_lama["Total Pembayaran"].dtype)
+    bulan_aktif = np.zeros(n, dtype=np.int64)
+    bulan_pembayaran = np.zeros(n, dtype=np.int64)
+    total[idx_ada] = df_lama["Total Pembayaran"].to_numpy()[pos_ada]
+    bulan_aktif[idx_ada] = df_lama["bulan_aktif"].to_numpy()[pos_ada]
+    bulan_pembayaran[idx_ada] = df_lama["bulan_pembayaran"].to_numpy()[pos_ada]
+    if kolom_tambah:
+        matriks = matriks_pembayaran(df_baru, kolom_tambah)
+        total = total + (np.nansum(matriks, axis=1) if matriks.dtype.kind == "f" else matriks.sum(axis=1))
+        bulan_pembayaran += (matriks > 0).sum(axis=1)
+
+    # Baris berubah/baru: hitung penuh, hanya pada subset itu
+    idx_ulang = np.flatnonzero(hitung_ulang)
+    if len(idx_ulang):
+        sebagian, _ = hitung_kepatuhan(df_baru.iloc[idx_ulang].copy(deep=False), tahun_pajak)
+        total = total.astype(np.result_type(total.dtype, sebagian["Total Pembayaran"].dtype))
+        total[idx_ulang] = sebagian["Total Pembayaran"].to_numpy()
+        bulan_aktif[idx_ulang] = sebagian["bulan_aktif"].to_numpy()
+        bulan_pembayaran[idx_ulang] = sebagian["bulan_pembayaran"].to_numpy()
+
+    df_hasil = df_baru.copy(deep=False)
+    df_hasil["TMT"] = tmt_baru
+    df_hasil["Total Pembayaran"] = total
+    df_hasil["bulan_aktif"] = bulan_aktif
+    df_hasil["bulan_pembayaran"] = bulan_pembayaran
+    df_hasil["Rata-rata Pembayaran"] = total / np.where(bulan_pembayaran == 0, 1, bulan_pembayaran)
+    df_hasil["Kepatuhan (%)"] = bulan_pembayaran / np.where(bulan_aktif == 0, 1, bulan_aktif) * 100
+    df_hasil["Klasifikasi Kepatuhan"] = klasifikasi_kepatuhan(bulan_aktif, bulan_pembayaran)
+
+    info = {
+        "baris_baru": int((~ada).sum()),
+        "baris_berubah": int(berubah.sum()),
+        "baris_dihapus": len(df_lama) - int(ada.sum()),
+        "bulan_baru": len(kolom_tambah),
+    }
+    return df_hasil, payment_cols, info
+
+
+def hitung_kepatuhan_inkremental_cache(df, file_hash, sheet, tahun_pajak, cache, nama=None):
+    # Seperti hitung_kepatuhan_cache, tetapi bila sheet yang sama dari file bernama sama
+    # pernah dihitung dari upload lain, hasil itu dipakai sebagai dasar. Cache dibagi semua
+    # sesi, jadi upload sebelumnya dikenali dari nama file (batch: daftar nama file) + sheet,
+    # bukan nama sheet saja. Mengembalikan (df_hasil, payment_cols, info); info None bila
+    # hasil diambil dari cache atau dihitung penuh.
+    tahun_pajak = int(tahun_pajak)
+    key = ("kepatuhan", (file_hash, sheet), tahun_pajak)
+    key_terakhir = ("terakhir", nama, sheet, tahun_pajak)
+    hasil, info = cache.get(key), None
+    if hasil is None:
+        hash_lama = cache.get(key_terakhir)
+        lama = cache.get(("kepatuhan", (hash_lama, sheet), tahun_pajak)) if hash_lama else None
+        pembaruan = perbarui_kepatuhan(lama[0], lama[1], df, tahun_pajak) if lama is not None else None
+        if pembaruan is not None:
+            hasil, info = pembaruan[:2], pembaruan[2]
+            cache.put(key, hasil)
+        else:
+            hasil = hitung_kepatuhan_cache(df, (file_hash, sheet), tahun_pajak, cache)
+    cache.put(key_terakhir, file_hash)
+    return hasil + (info,)
@@ -0,0 +1,78 @@
+# Instrumentasi opsional per tahap pipeline: waktu, puncak memori (tracemalloc)
+# dan jumlah baris. Saat tidak aktif, ukur() hanya context manager kosong.
+#
+# tracemalloc berlaku untuk seluruh proses, sedangkan tahap bisa berjalan bersamaan
+# (thread latar dan tampilan, atau beberapa sesi). Karena itu tracing dinyalakan oleh
+# tahap pertama yang aktif dan dimatikan oleh tahap terakhir yang selesai, dan puncak
+# hanya di-reset bila tidak ada tahap lain yang sedang diukur. Puncak tahap yang
+# tumpang tindih dengan tahap lain mencakup alokasi keduanya, jadi ditandai perkiraan.
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("kepatuhan")
+
+_lock = threading.Lock()
+_jalan = 0  # jumlah tahap yang sedang diukur
+_nomor = 0  # nomor tahap terakhir yang mulai diukur
+_dinyalakan = False  # tracing dinyalakan di sini (bukan oleh python -X tracemalloc)
+
+
+def aktifkan_log(level=logging.INFO):
+    # Log terstruktur (satu objek JSON per baris) ke stderr
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(level)
+
+
+class Instrumen:
+    def __init__(self, aktif=False, sesi=None):
+        self.aktif = aktif
+        self.sesi = sesi
+        self.catatan = []
+
+    @contextmanager
+    def ukur(self, tahap):
+        # Pemanggil boleh mengisi dict yang di-yield, mis. info["rows"] = len(df)
+        info = {}
+        if not self.aktif:
+            yield info
+            return
+
+        global _jalan, _nomor, _dinyalakan
+        with _lock:
+            if _jalan == 0:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    _dinyalakan = True
+                tracemalloc.reset_peak()
+            _jalan += 1
+            _nomor += 1
+            nomor = _nomor
+            tumpang = _jalan > 1
+            awal, _ = tracemalloc.get_traced_memory()
+        mulai = time.perf_counter()
+        try:
+            yield info
+        finally:
+            detik = time.perf_counter() - mulai
+            with _lock:
+                _, puncak = tracemalloc.get_traced_memory()
+                # Ada tahap lain yang mulai sesudah tahap ini atau masih berjalan
+                tumpang = tumpang or _nomor != nomor or _jalan > 1
+                _jalan -= 1
+                if _jalan == 0 and _dinyalakan:
+                    tracemalloc.stop()
+                    _dinyalakan = False
+            puncak_mb = round(max(puncak - awal, 0) / 1024 ** 2, 2)
+            catatan = {"tahap": tahap, "detik": round(detik, 4), "puncak_mb": puncak_mb}
+            if tumpang:
+                catatan["puncak_perkiraan"] = True
+            catatan.update(info)
+            self.catatan.append(catatan)
+            logger.info(json.dumps({"event": "tahap_pipeline", "sesi": self.sesi, **catatan}, default=str))
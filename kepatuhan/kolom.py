@@ -0,0 +1,113 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+
+import pandas as pd
+
+REQUIRED_COLS = ["TMT", "Nama Op", "Nm Unit", "KLASIFIKASI", "STATUS"]
+
+# Gabungan tabel alias dari semua versi dashboard lama. Kunci sudah dalam bentuk
+# ternormalisasi (huruf kecil, tanpa titik, garis bawah jadi spasi).
+KOLOM_ALIAS = {
+    'tmt': 'TMT', 'tgl mulai': 'TMT',
+    'nama wp': 'Nama Op', 'nama op': 'Nama Op',
+    'nm unit': 'Nm Unit', 'unit': 'Nm Unit',
+    'kategori': 'KLASIFIKASI', 'klasifikasi': 'KLASIFIKASI',
+    'klasifikasi hiburan': 'KLASIFIKASI', 'jenis': 'KLASIFIKASI',
+    'status': 'STATUS',
+}
+
+# Singkatan dan nama bulan Indonesia/Inggris (huruf kecil, tanpa titik)
+NAMA_BULAN = {
+    'jan': 1, 'januari': 1, 'january': 1,
+    'feb': 2, 'peb': 2, 'februari': 2, 'pebruari': 2, 'february': 2,
+    'mar': 3, 'maret': 3, 'march': 3,
+    'apr': 4, 'april': 4,
+    'mei': 5, 'may': 5,
+    'jun': 6, 'juni': 6, 'june': 6,
+    'jul': 7, 'juli': 7, 'july': 7,
+    'agu': 8, 'agt': 8, 'ags': 8, 'agus': 8, 'agustus': 8, 'aug': 8, 'august': 8,
+    'sep': 9, 'sept': 9, 'september': 9,
+    'okt': 10, 'oktober': 10, 'oct': 10, 'october': 10,
+    'nov': 11, 'nop': 11, 'november': 11, 'nopember': 11,
+    'des': 12, 'desember': 12, 'dec': 12, 'december': 12,
+}
+
+# "Jan-24", "Januari 2024", "agt.24", "Des '24"
+POLA_NAMA_BULAN = re.compile(r"^\s*([a-z]+)\.?[\s\-/_.']*(\d{2}|\d{4})\s*$", re.IGNORECASE)
+# "2024-01-01" atau "2024-01-01 00:00:00" (header tanggal yang sudah menjadi teks)
+POLA_ISO = re.compile(r"^\s*(\d{4})-(\d{1,2})-\d{1,2}(?:[ T]\d{1,2}:\d{2}(?::\d{2})?)?\s*$")
+
+
+def normalisasi_nama(col):
+    # Header bertipe tanggal (sel Excel berformat tanggal) dibiarkan apa adanya
+    # supaya tetap terdeteksi sebagai kolom bulan.
+    if isinstance(col, datetime):
+        return pd.Timestamp(col)
+    nama = str(col).strip().lower().replace('.', '').replace('_', ' ')
+    return KOLOM_ALIAS.get(nama, nama)
+
+
+def normalisasi_kolom(df):
+    df.columns = [normalisasi_nama(col) for col in df.columns]
+    # Dua kolom sumber bisa jatuh ke alias yang sama (mis. 'kategori' dan 'jenis'); ambil yang pertama
+    if df.columns.duplicated().any():
+        df = df.loc[:, ~df.columns.duplicated()]
+    return df
+
+
+@lru_cache(maxsize=4096)
+def klasifikasi_header(nama):
+    # (tahun, bulan) untuk header bulan, None untuk header lain
+    if isinstance(nama, datetime):
+        return nama.year, nama.month
+    if not isinstance(nama, str):
+        return None
+    cocok = POLA_NAMA_BULAN.match(nama)
+    if cocok:
+        bulan = NAMA_BULAN.get(cocok.group(1).lower())
+        if bulan is None:
+            return None
+        tahun = int(cocok.group(2))
+        if tahun < 100:
+            # sama dengan aturan %y: 00-68 -> 20xx, 69-99 -> 19xx
+            tahun += 2000 if tahun < 69 else 1900
+        return tahun, bulan
+    cocok = POLA_ISO.match(nama)
+    if cocok and 1 <= int(cocok.group(2)) <= 12:
+        return int(cocok.group(1)), int(cocok.group(2))
+    return None
+
+
+def konversi_nama_bulan(nama):
+    if isinstance(nama, datetime):
+        return nama
+    tahun_bulan = klasifikasi_header(nama)
+    if tahun_bulan is None:
+        return nama
+    return pd.Timestamp(*tahun_bulan, 1)
+
+
+def konversi_kolom_bulan(df):
+    df.columns = [konversi_nama_bulan(col) for col in df.columns]
+    return df
+
+
+@lru_cache(maxsize=128)
+def peta_bulan(columns):
+    # Dihitung sekali per susunan kolom sheet lalu dipakai ulang untuk setiap tahun pajak
+    peta = {}
+    for col in columns:
+        if isinstance(col, datetime):
+            peta.setdefault(col.year, []).append(col)
+    return peta
+
+
+def kolom_pembayaran(df, tahun_pajak):
+    return list(peta_bulan(tuple(df.columns)).get(tahun_pajak, []))
+
+
+def label_kolom(col):
+    if isinstance(col, datetime):
+        return col.strftime('%b-%y')
+    return str(col)
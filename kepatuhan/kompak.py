@@ -0,0 +1,54 @@
+# Tahap optimasi dtype setelah normalisasi: nilai pembayaran disimpan sebagai satu
+# blok int64 (rupiah) yang kontigu, atau float64 bila ada nilai pecahan (mis. dalam
+# ribuan/jutaan rupiah); kolom teks berulang menjadi categorical.
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .indeks import KOLOM_FILTER
+
+# Kolom teks dijadikan categorical bila jumlah nilai unik <= rasio ini x jumlah baris
+RASIO_KATEGORI = 0.5
+
+
+def ukuran_mb(df):
+    return round(float(df.memory_usage(deep=True).sum()) / 1024 ** 2, 2)
+
+
+def blok_pembayaran(df, payment_cols):
+    # Nilai non-angka/kosong dianggap 0. Blok int64 hanya bila semua nilai bulat;
+    # pecahan tidak dibulatkan karena 0,4 tetap dihitung sebagai bulan bayar
+    if all(pd.api.types.is_integer_dtype(df[col]) for col in payment_cols):
+        return np.ascontiguousarray(df[payment_cols].to_numpy(dtype=np.int64))
+    blok = df[payment_cols].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    blok = np.ascontiguousarray(np.nan_to_num(blok, nan=0.0, posinf=np.inf, neginf=-np.inf))
+    if np.isfinite(blok).all() and np.all(blok == np.rint(blok)):
+        return blok.astype(np.int64)
+    return blok
+
+
+def kompakkan(df, rasio_kategori=RASIO_KATEGORI):
+    sebelum = ukuran_mb(df)
+    payment_cols = [col for col in df.columns if isinstance(col, datetime)]
+
+    kolom = {}
+    for col in df.columns:
+        if isinstance(col, datetime):
+            continue
+        seri = df[col]
+        if col == "TMT" and not pd.api.types.is_datetime64_any_dtype(seri):
+            seri = pd.to_datetime(seri, errors="coerce")
+        elif not isinstance(seri.dtype, pd.CategoricalDtype) and (
+                col in KOLOM_FILTER
+                or (pd.api.types.is_object_dtype(seri) or pd.api.types.is_string_dtype(seri))
+                and seri.nunique() <= rasio_kategori * len(seri)):
+            seri = seri.astype("category")
+        kolom[col] = seri
+
+    bagian = [pd.DataFrame(kolom, index=df.index)]
+    if payment_cols:
+        bagian.append(pd.DataFrame(blok_pembayaran(df, payment_cols), index=df.index, columns=payment_cols))
+    hasil = pd.concat(bagian, axis=1)[list(df.columns)]
+    hasil.attrs["laporan_dtype"] = {"memori_awal_mb": sebelum, "memori_akhir_mb": ukuran_mb(hasil)}
+    return hasil
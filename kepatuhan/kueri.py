@@ -0,0 +1,145 @@
+# Mode SQL opsional: tabel hasil didaftarkan sekali ke DuckDB (in-memory, lokal) lalu
+# filter sidebar, pie, tren bulanan, Top-N dan sebaran dijawab dengan kueri yang
+# dijalankan DuckDB secara kolumnar dan multi-thread. Antarmukanya sama dengan
+# IndeksFilter (opsi/cari) dan KubusRingkasan (data_pie/tren_bulanan/top_objek/
+# sebaran_total), jadi tampilan tidak membedakan keduanya dan jalur pandas tetap
+# bisa dipakai untuk membandingkan hasil.
+#
+# DuckDB tidak wajib (pip install duckdb); tanpa itu mode SQL tidak ditampilkan.
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .indeks import KOLOM_FILTER
+from .ringkasan import KOLOM_NILAI_OBJEK, KOLOM_OBJEK, susun_pie, susun_sebaran, susun_tren
+
+
+def duckdb_tersedia():
+    return importlib.util.find_spec("duckdb") is not None
+
+
+def _kutip(nama):
+    return '"' + nama.replace('"', '""') + '"'
+
+
+def _syarat(pilihan, tambahan=()):
+    # Pilihan sidebar {kolom: [nilai, ...]} -> (klausa WHERE, parameter)
+    syarat, parameter = list(tambahan), []
+    for kolom, nilai in pilihan.items():
+        if nilai:
+            syarat.append(f"{_kutip(kolom)} IN ({', '.join('?' * len(nilai))})")
+            parameter.extend(nilai)
+    return (" WHERE " + " AND ".join(syarat) if syarat else ""), parameter
+
+
+def _urut_opsi(nilai):
+    try:
+        return sorted(nilai)
+    except TypeError:
+        return sorted(nilai, key=str)
+
+
+class KueriDuckDB:
+    def __init__(self, df_hasil, payment_cols, max_memo=64):
+        import duckdb
+
+        self.payment_cols = list(payment_cols)
+        # Kolom bulan (Timestamp) diberi nama SQL biasa; urutannya sama dengan payment_cols
+        self._kolom_bulan = [f"bulan_{i}" for i in range(len(self.payment_cols))]
+        kolom = list(dict.fromkeys(KOLOM_FILTER + KOLOM_OBJEK + ["Klasifikasi Kepatuhan"] + KOLOM_NILAI_OBJEK))
+        frame = df_hasil[kolom + self.payment_cols].set_axis(kolom + self._kolom_bulan, axis=1)
+        frame.insert(0, "baris", np.arange(len(frame), dtype=np.int64))
+        self._dtype_total = df_hasil["Total Pembayaran"].dtype
+        self._nbytes = int(frame.memory_usage().sum())
+
+        # Disalin ke tabel DuckDB sendiri (bukan view atas frame pandas)
+        self._con = duckdb.connect(":memory:")
+        self._con.register("sumber", frame)
+        self._con.execute("CREATE TABLE hasil AS SELECT * FROM sumber")
+        self._con.unregister("sumber")
+        self._memo = LRUCache(max_entries=max_memo)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def _ambil(self, sql, parameter=()):
+        # Satu cursor per kueri: koneksi dibagi semua sesi, cursor aman dipakai per thread
+        with self._con.cursor() as cur:
+            return cur.execute(sql, parameter).fetchall()
+
+    def _ambil_df(self, sql, parameter=()):
+        with self._con.cursor() as cur:
+            return cur.execute(sql, parameter).df()
+
+    def opsi(self, kolom, pilihan=None):
+        where, parameter = _syarat(pilihan or {}, [f"{_kutip(kolom)} IS NOT NULL"])
+        return _urut_opsi([nilai for nilai, in self._ambil(f"SELECT DISTINCT {_kutip(kolom)} FROM hasil{where}",
+                                                            parameter)])
+
+    def cari(self, pilihan):
+        # Posisi baris (terurut) yang lolos filter; None berarti semua baris lolos
+        key = tuple((kolom, tuple(nilai)) for kolom, nilai in pilihan.items() if nilai)
+        if not key:
+            return None
+        return self._memo.ambil_atau_buat(key, lambda: self._posisi(pilihan))
+
+    def _posisi(self, pilihan):
+        where, parameter = _syarat(pilihan)
+        with self._con.cursor() as cur:
+            posisi = cur.execute(f"SELECT baris FROM hasil{where} ORDER BY baris", parameter).fetchnumpy()["baris"]
+        return np.asarray(posisi, dtype=np.intp)
+
+    def data_pie(self, pilihan):
+        where, parameter = _syarat(pilihan)
+        jumlah = self._ambil_df(f'SELECT "Klasifikasi Kepatuhan" AS kelas, count(*) AS jumlah FROM hasil{where} '
+                                "GROUP BY ALL", parameter)
+        return susun_pie(jumlah.dropna().set_index("kelas")["jumlah"].rename_axis(None).astype(np.int64))
+
+    def tren_bulanan(self, pilihan):
+        total = []
+        if self._kolom_bulan:
+            where, parameter = _syarat(pilihan)
+            jumlah = ", ".join(f"coalesce(sum({kolom}), 0)" for kolom in self._kolom_bulan)
+            total = self._ambil(f"SELECT {jumlah} FROM hasil{where}", parameter)[0]
+        return susun_tren(pd.Series(np.array(total), index=self.payment_cols))
+
+    def _sql_objek(self, pilihan):
+        # Total dan jumlah bulan bayar per objek; seperti groupby, objek dengan kunci kosong dilewati
+        kunci = ", ".join(map(_kutip, KOLOM_OBJEK))
+        where, parameter = _syarat(pilihan, [f"{_kutip(k)} IS NOT NULL" for k in KOLOM_OBJEK])
+        sql = (f'SELECT {kunci}, sum("Total Pembayaran") AS total, sum(bulan_pembayaran) AS bulan '
+               f"FROM hasil{where} GROUP BY {kunci}")
+        return sql, parameter
+
+    def top_objek(self, pilihan, n=5, urut="Total Pembayaran", per_unit=False):
+        sql_objek, parameter = self._sql_objek(pilihan)
+        nilai = "total" if urut == "Total Pembayaran" else "rata"
+        # Nilai sama diurutkan menurut kunci supaya hasilnya tetap di tiap kueri
+        urutan = f"{nilai} DESC, " + ", ".join(map(_kutip, KOLOM_OBJEK))
+        sql = (f"WITH objek AS ({sql_objek}), "
+               "peringkat AS (SELECT *, total / CASE WHEN bulan = 0 THEN 1 ELSE bulan END AS rata FROM objek) "
+               # Kunci dikirim sebagai teks: ENUM Nama Op bisa berisi ratusan ribu kategori
+               f"SELECT {', '.join(f'{_kutip(k)}::VARCHAR AS {_kutip(k)}' for k in KOLOM_OBJEK)}, total, rata "
+               "FROM peringkat ")
+        if per_unit:
+            sql += (f'QUALIFY row_number() OVER (PARTITION BY "Nm Unit" ORDER BY {urutan}) <= ? '
+                    f'ORDER BY "Nm Unit", {urutan}')
+        else:
+            sql += f"ORDER BY {urutan} LIMIT ?"
+        hasil = self._ambil_df(sql, parameter + [int(n)])
+        hasil["total"] = hasil["total"].astype(self._dtype_total)
+        return hasil.rename(columns={"total": "Total Pembayaran", "rata": "Rata-rata Pembayaran"})
+
+    def sebaran_total(self, pilihan, bins=20):
+        sql_objek, parameter = self._sql_objek(pilihan)
+        with self._con.cursor() as cur:
+            total = cur.execute(f"SELECT total::DOUBLE AS total FROM ({sql_objek})", parameter).fetchnumpy()["total"]
+        return susun_sebaran(np.asarray(total, dtype=np.float64), bins)
+
+
+def kueri_cache(df_hasil, payment_cols, key, cache):
+    key = ("kueri",) + tuple(key)
+    return cache.ambil_atau_buat(key, lambda: KueriDuckDB(df_hasil, payment_cols))
@@ -0,0 +1,232 @@
+# Perhitungan kepatuhan terpartisi untuk rekap seluruh UPPPD. Baris dikelompokkan
+# per Nm Unit lalu dibagi ke beberapa shard; tiap shard dihitung di proses
+# terpisah. Matriks pembayaran, TMT dan kode kolom kunci ditaruh sekali di shared
+# memory (tidak di-pickle ke tiap proses); proses menulis hasil per baris ke
+# shared memory juga, dan hanya mengirim balik agregat kecil untuk kubus.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .hitung import KELAS_KEPATUHAN, bulan_aktif_dari, kode_kepatuhan
+from .kolom import kolom_pembayaran
+from .ringkasan import KOLOM_OBJEK, KubusRingkasan
+
+# Urutan kolom di blok kode; kunci sel kubus = unit, klasifikasi, status (+ kelas)
+KOLOM_KODE = ["Nm Unit", "KLASIFIKASI", "STATUS", "Nama Op"]
+
+# Di bawah jumlah baris ini biaya start proses dan salin ke shared memory lebih mahal
+BATAS_PARTISI = int(os.environ.get("KEPATUHAN_BATAS_PARTISI", 200_000))
+JUMLAH_PROSES = int(os.environ.get("KEPATUHAN_PROSES", os.cpu_count() or 1))
+
+# Shard per proses; lebih dari satu agar unit besar dan kecil lebih merata
+SHARD_PER_PROSES = 2
+
+
+def buat_pool(jumlah_proses=JUMLAH_PROSES):
+    # spawn: aman dipanggil dari thread (Streamlit, pekerja latar)
+    return ProcessPoolExecutor(max_workers=jumlah_proses, mp_context=get_context("spawn"))
+
+
+def layak_dipartisi(df, jumlah_proses=JUMLAH_PROSES):
+    return jumlah_proses > 1 and len(df) >= BATAS_PARTISI and df["Nm Unit"].nunique() > 1
+
+
+def _kode(seri):
+    # Kode bilangan bulat mulai 0 (0 = kosong) dan daftar nilainya
+    if isinstance(seri.dtype, pd.CategoricalDtype):
+        return seri.cat.codes.to_numpy().astype(np.int64) + 1, seri.cat.categories
+    kode, nilai = pd.factorize(seri)
+    return kode.astype(np.int64) + 1, nilai
+
+
+def _urai(kode, nilai, sumber):
+    # Kebalikan _kode; dtype mengikuti kolom asal (categorical tetap categorical)
+    if isinstance(sumber.dtype, pd.CategoricalDtype):
+        return pd.Categorical.from_codes(kode - 1, dtype=sumber.dtype)
+    return pd.api.extensions.take(np.asarray(nilai, dtype=object), kode - 1, allow_fill=True)
+
+
+class _Blok:
+    # Array di shared memory; yang dikirim ke proses lain hanya (nama, shape, dtype, order)
+    def __init__(self, shape, dtype, order="C", nama=None):
+        ukuran = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self.shm = shared_memory.SharedMemory(name=nama, create=nama is None, size=ukuran if nama is None else 0)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, order=order)
+        self.spec = (self.shm.name, shape, np.dtype(dtype).str, order)
+
+    @classmethod
+    def buka(cls, spec):
+        nama, shape, dtype, order = spec
+        return cls(shape, dtype, order, nama=nama)
+
+    def tutup(self, hapus=False):
+        del self.array
+        self.shm.close()
+        if hapus:
+            self.shm.unlink()
+
+
+def _satukan(kode, radix):
+    # Beberapa kolom kode jadi satu kunci int64: ((k0 * r1 + k1) * r2 + k2) ...
+    kunci = kode[0]
+    for k, r in zip(kode[1:], radix[1:]):
+        kunci = kunci * r + k
+    return kunci
+
+
+def _pecah(kunci, radix):
+    # Kebalikan _satukan
+    kode = []
+    for r in reversed(radix[1:]):
+        kunci, k = np.divmod(kunci, r)
+        kode.append(k)
+    return [kunci] + kode[::-1]
+
+
+def _kelompok(kunci):
+    # Posisi urut dan awal tiap kelompok kunci yang sama
+    urut = np.argsort(kunci, kind="stable")
+    k = kunci[urut]
+    awal = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+    return urut, awal, k[awal]
+
+
+def _hitung_shard(spec, radix, awal, akhir, tahun_pajak):
+    # Dijalankan di proses pool untuk baris [awal, akhir) (satu atau beberapa unit utuh)
+    blok = {nama: _Blok.buka(s) for nama, s in spec.items()}
+    try:
+        matriks = blok["matriks"].array[awal:akhir]
+        tmt = blok["tmt"].array[awal:akhir]
+        kosong = np.isnat(tmt)
+        tahun = np.where(kosong, np.nan, tmt.astype("M8[Y]").astype(np.int64) + 1970)
+        bulan = np.where(kosong, np.nan, tmt.astype("M8[M]").astype(np.int64) % 12 + 1)
+        kode = blok["kode"].array[awal:akhir]
+        if matriks.dtype.kind == "f":
+            matriks = np.nan_to_num(matriks, nan=0.0)
+        total = matriks.sum(axis=1)
+        bulan_pembayaran = (matriks > 0).sum(axis=1)
+        bulan_aktif = bulan_aktif_dari(tahun, bulan, tahun_pajak)
+        kelas = kode_kepatuhan(bulan_aktif, bulan_pembayaran)
+        blok["total"].array[awal:akhir] = total
+        blok["aktif"].array[awal:akhir] = bulan_aktif
+        blok["bayar"].array[awal:akhir] = bulan_pembayaran
+        blok["kelas"].array[awal:akhir] = kelas
+
+        # Sel kubus: (unit, klasifikasi, status, kelas) -> jumlah objek + total per bulan
+        kunci = _satukan([kode[:, 0], kode[:, 1], kode[:, 2], kelas], radix[:3] + [len(KELAS_KEPATUHAN)])
+        urut, mulai, kunci_sel = _kelompok(kunci)
+        sel = (kunci_sel, np.diff(np.r_[mulai, len(kunci)]), np.add.reduceat(matriks[urut], mulai, axis=0))
+
+        # Total dan jumlah bulan bayar per objek: (unit, klasifikasi, status, nama)
+        kunci = _satukan([kode[:, 0], kode[:, 1], kode[:, 2], kode[:, 3]], radix)
+        urut, mulai, kunci_objek = _kelompok(kunci)
+        objek = (kunci_objek, np.add.reduceat(total[urut], mulai), np.add.reduceat(bulan_pembayaran[urut], mulai))
+        return sel, objek
+    finally:
+        for b in blok.values():
+            b.tutup()
+
+
+def _shard(kode_unit, jumlah_shard):
+    # Batas [awal, akhir) per shard pada baris yang sudah diurutkan per unit; unit tidak dipecah
+    batas_unit = np.flatnonzero(np.r_[True, kode_unit[1:] != kode_unit[:-1], True])
+    target = np.linspace(0, len(kode_unit), jumlah_shard + 1)[1:-1]
+    tengah = batas_unit[np.searchsorted(batas_unit, target)]
+    batas = np.unique(np.r_[0, tengah, len(kode_unit)])
+    return list(zip(batas[:-1], batas[1:]))
+
+
+def _isi_matriks(df, payment_cols, urutan):
+    # Seperti matriks_pembayaran, tetapi langsung disalin (terurut) ke shared memory per kolom.
+    # Kolom-mayor supaya tiap salinan kolom menulis memori yang bersebelahan.
+    kolom = [df[col] for col in payment_cols]
+    if not all(seri.dtype.kind in "iuf" for seri in kolom):
+        kolom = [pd.to_numeric(seri, errors="coerce").astype(np.float64) for seri in kolom]
+    dtype = np.result_type(*(seri.dtype for seri in kolom)) if kolom else np.float64
+    blok = _Blok((len(df), len(kolom)), dtype, order="F")
+    for j, seri in enumerate(kolom):
+        np.take(seri.to_numpy(dtype=dtype), urutan, out=blok.array[:, j])
+    return blok
+
+
+def hitung_kepatuhan_partisi(df, tahun_pajak, pool, jumlah_shard=JUMLAH_PROSES * SHARD_PER_PROSES):
+    # Hasil sama dengan hitung_kepatuhan + KubusRingkasan. Mengembalikan (df_hasil, payment_cols, kubus).
+    df = df.copy(deep=False)
+    df["TMT"] = pd.to_datetime(df["TMT"], errors="coerce")
+    payment_cols = kolom_pembayaran(df, tahun_pajak)
+    n = len(df)
+
+    sumber = [df[col] for col in KOLOM_KODE]
+    kode, nilai = zip(*(_kode(seri) for seri in sumber))
+    radix = [len(v) + 1 for v in nilai]
+    urutan = np.argsort(kode[0], kind="stable")
+
+    blok = {}
+    try:
+        # Salinan terurut per unit: tiap shard jadi potongan baris yang bersebelahan
+        blok["matriks"] = _isi_matriks(df, payment_cols, urutan)
+        tmt = df["TMT"].to_numpy()
+        blok["tmt"] = _Blok((n,), tmt.dtype)
+        np.take(tmt, urutan, out=blok["tmt"].array)
+        blok["kode"] = _Blok((n, len(KOLOM_KODE)), np.int64, order="F")
+        for i, k in enumerate(kode):
+            blok["kode"].array[:, i] = k[urutan]
+        blok["total"] = _Blok((n,), np.float64 if blok["matriks"].array.dtype.kind == "f" else np.int64)
+        blok["aktif"] = _Blok((n,), np.int64)
+        blok["bayar"] = _Blok((n,), np.int64)
+        blok["kelas"] = _Blok((n,), np.int8)
+        spec = {nama: b.spec for nama, b in blok.items()}
+
+        futures = [pool.submit(_hitung_shard, spec, radix, awal, akhir, int(tahun_pajak))
+                   for awal, akhir in _shard(blok["kode"].array[:, 0], jumlah_shard)]
+        bagian = [f.result() for f in futures]
+
+        # Kembalikan ke urutan baris asal
+        hasil = {}
+        for nama in ("total", "aktif", "bayar", "kelas"):
+            hasil[nama] = np.empty_like(blok[nama].array)
+            hasil[nama][urutan] = blok[nama].array
+    finally:
+        for b in blok.values():
+            b.tutup(hapus=True)
+
+    total, bulan_aktif, bulan_pembayaran = hasil["total"], hasil["aktif"], hasil["bayar"]
+    df["Total Pembayaran"] = total
+    df["bulan_aktif"] = bulan_aktif
+    df["bulan_pembayaran"] = bulan_pembayaran
+    df["Rata-rata Pembayaran"] = total / np.where(bulan_pembayaran == 0, 1, bulan_pembayaran)
+    df["Kepatuhan (%)"] = bulan_pembayaran / np.where(bulan_aktif == 0, 1, bulan_aktif) * 100
+    df["Klasifikasi Kepatuhan"] = pd.Categorical.from_codes(hasil["kelas"], categories=KELAS_KEPATUHAN)
+
+    # Shard tidak berbagi unit, jadi agregat parsial cukup disambung
+    kode_sel = _pecah(np.concatenate([s[0] for s, _ in bagian]), radix[:3] + [len(KELAS_KEPATUHAN)])
+    sel = pd.DataFrame({col: _urai(kode_sel[i], nilai[i], sumber[i]) for i, col in enumerate(KOLOM_KODE[:3])})
+    sel["Klasifikasi Kepatuhan"] = pd.Categorical.from_codes(kode_sel[3], categories=KELAS_KEPATUHAN)
+    sel["Jumlah"] = np.concatenate([s[1] for s, _ in bagian])
+    sel = pd.concat([sel, pd.DataFrame(np.concatenate([s[2] for s, _ in bagian]), columns=payment_cols)], axis=1)
+
+    kode_objek = dict(zip(KOLOM_KODE, _pecah(np.concatenate([o[0] for _, o in bagian]), radix)))
+    objek = pd.DataFrame({col: _urai(kode_objek[col], nilai[KOLOM_KODE.index(col)], sumber[KOLOM_KODE.index(col)])
+                          for col in KOLOM_OBJEK + ["STATUS"]})
+    objek["Total Pembayaran"] = np.concatenate([o[1] for _, o in bagian])
+    objek["bulan_pembayaran"] = np.concatenate([o[2] for _, o in bagian])
+
+    return df, payment_cols, KubusRingkasan.dari_tabel(sel, objek, payment_cols)
+
+
+def hitung_kepatuhan_partisi_cache(df, sheet_key, tahun_pajak, pool, cache):
+    # Disimpan di key yang sama dengan hitung_kepatuhan_cache dan kubus_cache, sehingga
+    # tampilan dan pembaruan inkremental berikutnya memakai hasil ini apa adanya.
+    tahun_pajak = int(tahun_pajak)
+    key = ("kepatuhan", sheet_key, tahun_pajak)
+    key_kubus = ("kubus",) + tuple(sheet_key) + (tahun_pajak,)
+
+    def buat():
+        df_hasil, payment_cols, kubus = hitung_kepatuhan_partisi(df, tahun_pajak, pool)
+        cache.put(key_kubus, kubus)
+        return df_hasil, payment_cols
+
+    return cache.ambil_atau_buat(key, buat)
@@ -0,0 +1,137 @@
+# Pemuatan dan perhitungan di thread latar. Tampilan hanya memulai Tugas, membaca
+# tahap yang sudah dilaporkan, dan membatalkannya bila input berubah. Pembatalan
+# bersifat kooperatif: diperiksa di antara tahap (read_excel sendiri tidak bisa
+# dihentikan di tengah jalan, tetapi hasilnya tetap masuk cache untuk dipakai lagi).
+import threading
+
+from .hitung import KELAS_KEPATUHAN
+from .arsip import muat_cache as muat_arsip_cache
+from .inkremental import hitung_kepatuhan_inkremental_cache
+from .kolom import REQUIRED_COLS, kolom_pembayaran
+from .partisi import hitung_kepatuhan_partisi_cache, layak_dipartisi
+from .pemuatan import muat_batch_cache, muat_sheet
+from .streaming import muat_streaming_cache
+
+JUMLAH_TAHAP = 4
+
+
+class Dibatalkan(Exception):
+    pass
+
+
+class Tugas:
+    def __init__(self, key, instrumen):
+        self.key = key
+        self.instrumen = instrumen
+        self.tahap = []
+        self.future = None
+        self._batal = threading.Event()
+
+    def lapor(self, pesan):
+        self.tahap.append(pesan)
+        self.cek()
+
+    def cek(self):
+        if self._batal.is_set():
+            raise Dibatalkan()
+
+    def batalkan(self):
+        self._batal.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def progres(self):
+        return min(len(self.tahap) / JUMLAH_TAHAP, 1.0)
+
+
+def mulai(pelaksana, key, kerja, instrumen):
+    # kerja(tugas) dijalankan di thread pelaksana dan mengembalikan dict konteks
+    tugas = Tugas(key, instrumen)
+    tugas.future = pelaksana.submit(kerja, tugas)
+    return tugas
+
+
+def _ringkas_kelas(df_hasil):
+    jumlah = df_hasil["Klasifikasi Kepatuhan"].value_counts()
+    return ", ".join(f"{kelas} {jumlah.get(kelas, 0):,}" for kelas in KELAS_KEPATUHAN)
+
+
+def _hitung(tugas, df_input, file_hash, sheet, tahun_pajak, cache_hasil, nama, pool=None):
+    missing_cols = [col for col in REQUIRED_COLS if col not in df_input.columns]
+    if missing_cols:
+        raise ValueError(f"Kolom wajib hilang: {', '.join(missing_cols)}")
+    tugas.lapor(f"🗓️ {len(kolom_pembayaran(df_input, tahun_pajak))} kolom bulan {tahun_pajak} terdeteksi")
+
+    with tugas.instrumen.ukur("kepatuhan") as info:
+        if pool is not None and layak_dipartisi(df_input):
+            # Rekap besar: dipecah per Nm Unit ke beberapa proses
+            df_hasil, payment_cols = hitung_kepatuhan_partisi_cache(
+                df_input, (file_hash, sheet), tahun_pajak, pool, cache_hasil)
+            pembaruan = None
+            info["partisi"] = True
+        else:
+            # Upload ulang file dan sheet yang sama (mis. tambahan bulan baru) diperbarui dari hasil sebelumnya
+            df_hasil, payment_cols, pembaruan = hitung_kepatuhan_inkremental_cache(
+                df_input, file_hash, sheet, tahun_pajak, cache_hasil, nama)
+            info.update(pembaruan or {})
+        info["rows"] = len(df_hasil)
+        info["kolom_bulan"] = len(payment_cols)
+    tugas.lapor(f"✅ Kelas dihitung: {_ringkas_kelas(df_hasil)}")
+    return {"df_input": df_input, "file_hash": file_hash, "selected_sheet": sheet, "tahun_pajak": tahun_pajak,
+            "df_hasil": df_hasil, "payment_cols": payment_cols, "kubus": None, "pembaruan": pembaruan, "nama": nama,
+            "dilewati": []}
+
+
+def proses_sheet(tugas, data, file_hash, sheet, tahun_pajak, cache_sheet, cache_hasil, nama=None):
+    tugas.lapor(f"📖 Membaca sheet {sheet}...")
+    with tugas.instrumen.ukur("parsing") as info:
+        df_input = muat_sheet(data, file_hash, sheet, cache_sheet)
+        info["rows"] = len(df_input)
+        info.update(df_input.attrs.get("laporan_waktu", {}))
+        info.update(df_input.attrs.get("laporan_dtype", {}))
+    tugas.lapor(f"📄 {len(df_input):,} baris terbaca")
+    return _hitung(tugas, df_input, file_hash, sheet, tahun_pajak, cache_hasil, nama)
+
+
+def proses_batch(tugas, files, file_hash, tahun_pajak, cache_sheet, cache_hasil, pool=None):
+    tugas.lapor(f"📖 Membaca {len(files)} file...")
+    with tugas.instrumen.ukur("parsing") as info:
+        df_input = muat_batch_cache(files, file_hash, cache_sheet)
+        info["rows"] = len(df_input)
+        info.update(df_input.attrs.get("laporan_waktu", {}))
+        info.update(df_input.attrs.get("laporan_dtype", {}))
+    dilewati = df_input.attrs.get("sheet_dilewati", [])
+    if df_input.empty and dilewati:
+        raise ValueError(f"Tidak ada sheet dengan kolom wajib ({'; '.join(dilewati)})")
+    jumlah_sheet = df_input.groupby(["Sumber File", "Sumber Sheet"]).ngroups
+    tugas.lapor(f"📚 {len(df_input):,} baris terbaca dari {jumlah_sheet} sheet ({len(files)} file)")
+    nama = ", ".join(nama for nama, _ in files)
+    return {**_hitung(tugas, df_input, file_hash, None, tahun_pajak, cache_hasil, nama, pool), "dilewati": dilewati}
+
+
+def proses_arsip(tugas, file_hash, sheet, tahun_pajak, nama, cache_sheet, cache_hasil):
+    # Buka ulang dari arsip lokal: snapshot frame ternormalisasi, tanpa parsing Excel
+    tugas.lapor(f"🗄️ Membuka {nama} dari arsip...")
+    with tugas.instrumen.ukur("parsing") as info:
+        df_input = muat_arsip_cache(file_hash, sheet, cache_sheet)
+        if df_input is None:
+            raise ValueError(f"{nama} tidak ditemukan di arsip")
+        info["rows"] = len(df_input)
+        info["arsip"] = True
+    tugas.lapor(f"📄 {len(df_input):,} baris dari arsip")
+    return _hitung(tugas, df_input, file_hash, sheet, tahun_pajak, cache_hasil, nama)
+
+
+def proses_stream(tugas, data, file_hash, sheet, tahun_pajak, cache_sheet):
+    # Kepatuhan langsung dihitung per chunk; kolom bulan tidak disimpan
+    tugas.lapor(f"📖 Membaca sheet {sheet} secara bertahap...")
+    with tugas.instrumen.ukur("parsing") as info:
+        df_ringkas, payment_cols, kubus = muat_streaming_cache(data, file_hash, sheet, tahun_pajak, cache_sheet)
+        info["rows"] = len(df_ringkas)
+    tugas.lapor(f"📄 {len(df_ringkas):,} baris terbaca")
+    tugas.lapor(f"🗓️ {len(payment_cols)} kolom bulan {tahun_pajak} terdeteksi")
+    tugas.lapor(f"✅ Kelas dihitung: {_ringkas_kelas(df_ringkas)}")
+    return {"df_input": df_ringkas, "file_hash": file_hash, "selected_sheet": (sheet, "stream"),
+            "tahun_pajak": tahun_pajak, "df_hasil": df_ringkas, "payment_cols": payment_cols, "kubus": kubus,
+            "pembaruan": None, "nama": None, "dilewati": []}
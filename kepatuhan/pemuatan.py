@@ -0,0 +1,119 @@
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from .cache import baca_cache_disk, hash_file, tulis_cache_disk
+from .kompak import kompakkan
+from .kolom import REQUIRED_COLS, konversi_kolom_bulan, normalisasi_kolom
+
+
+def daftar_sheet(data, file_hash, cache):
+    key = ("sheets", file_hash)
+    return cache.ambil_atau_buat(key, lambda: pd.ExcelFile(BytesIO(data)).sheet_names)
+
+
+def _lama(waktu, tahap, mulai):
+    # Catat durasi satu langkah ke dict waktu; mengembalikan awal langkah berikutnya
+    sekarang = time.perf_counter()
+    waktu[tahap] = round(waktu.get(tahap, 0) + sekarang - mulai, 4)
+    return sekarang
+
+
+def muat_sheet_disk(data, file_hash, sheet_name):
+    # Durasi tiap langkah dicatat di attrs["laporan_waktu"] (ditampilkan di tahap parsing
+    # mode debug) supaya pembacaan Excel dan deteksi header bulan bisa dibedakan
+    waktu = {}
+    mulai = time.perf_counter()
+    df = baca_cache_disk(file_hash, sheet_name)
+    if df is not None:
+        _lama(waktu, "cache_disk_detik", mulai)
+    else:
+        df = pd.read_excel(BytesIO(data), sheet_name=sheet_name)
+        df = normalisasi_kolom(df)
+        mulai = _lama(waktu, "baca_excel_detik", mulai)
+        df = konversi_kolom_bulan(df)
+        mulai = _lama(waktu, "deteksi_bulan_detik", mulai)
+        df = kompakkan(df)
+        mulai = _lama(waktu, "kompak_detik", mulai)
+        tulis_cache_disk(df, file_hash, sheet_name)
+        _lama(waktu, "tulis_cache_detik", mulai)
+    df.attrs["laporan_waktu"] = waktu
+    return df
+
+
+def muat_sheet(data, file_hash, sheet_name, cache):
+    # Hasil parsing + normalisasi disimpan per (hash isi file, nama sheet) supaya
+    # rerun Streamlit (mis. ganti filter) tidak mem-parsing ulang workbook.
+    # Frame hasil cache dipakai bersama; jangan diubah in-place oleh pemanggil.
+    key = ("sheet", file_hash, sheet_name)
+    return cache.ambil_atau_buat(key, lambda: muat_sheet_disk(data, file_hash, sheet_name))
+
+
+KOLOM_SUMBER = ["Sumber File", "Sumber Sheet"]
+
+
+def _muat_sheet_batch(tugas):
+    # Dijalankan di proses worker; harus fungsi level modul agar bisa di-pickle.
+    # Mengembalikan (frame atau None, catatan sheet yang dilewati atau None).
+    nama_file, data, file_hash, sheet_name = tugas
+    df = muat_sheet_disk(data, file_hash, sheet_name)
+    if df.empty:
+        return None, None
+    # Sheet rekap/catatan tanpa kolom wajib tidak ikut digabung (barisnya akan jadi "Belum Aktif")
+    missing_cols = [col for col in REQUIRED_COLS if col not in df.columns]
+    if missing_cols:
+        return None, f"{nama_file} [{sheet_name}]: dilewati, kolom wajib hilang: {', '.join(missing_cols)}"
+    df = df.copy(deep=False)
+    df.insert(0, "Sumber Sheet", sheet_name)
+    df.insert(0, "Sumber File", nama_file)
+    return df, None
+
+
+def muat_batch(files, max_workers=None):
+    # files: daftar (nama_file, bytes). Semua sheet dari semua workbook
+    # di-parsing paralel lalu digabung menjadi satu frame. Sheet yang dilewati
+    # dicatat di attrs["sheet_dilewati"].
+    tugas = []
+    for nama_file, data in files:
+        file_hash = hash_file(data)
+        for sheet_name in pd.ExcelFile(BytesIO(data)).sheet_names:
+            tugas.append((nama_file, data, file_hash, sheet_name))
+
+    if len(tugas) <= 1 or max_workers == 1:
+        hasil = [_muat_sheet_batch(t) for t in tugas]
+    else:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn: aman dipakai dari server Streamlit yang multi-thread
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            hasil = list(pool.map(_muat_sheet_batch, tugas))
+
+    dilewati = [catatan for _, catatan in hasil if catatan]
+    hasil = [df for df, _ in hasil if df is not None]
+    # Durasi per langkah dijumlahkan dari semua sheet (waktu proses worker, bukan waktu dinding)
+    waktu = {}
+    for df in hasil:
+        for tahap, detik in df.attrs.get("laporan_waktu", {}).items():
+            waktu[tahap] = round(waktu.get(tahap, 0) + detik, 4)
+    if not hasil:
+        df = pd.DataFrame(columns=KOLOM_SUMBER)
+    else:
+        # concat categorical dengan kategori berbeda menghasilkan object, dan bulan yang tidak
+        # ada di semua sheet menjadi float dengan NaN; kompakkan ulang hasil gabungannya
+        mulai = time.perf_counter()
+        df = kompakkan(pd.concat(hasil, ignore_index=True, sort=False))
+        _lama(waktu, "kompak_detik", mulai)
+    df.attrs["sheet_dilewati"] = dilewati
+    df.attrs["laporan_waktu"] = waktu
+    return df
+
+
+def muat_batch_cache(files, batch_hash, cache):
+    key = ("batch", batch_hash)
+    return cache.ambil_atau_buat(key, lambda: muat_batch(files))
+
+
+def hash_batch(files):
+    return hash_file("".join(sorted(hash_file(data) for _, data in files)).encode())
@@ -0,0 +1,224 @@
+# Kubus pra-agregasi per (sheet, tahun pajak) untuk pie chart, tren bulanan dan
+# tabel Top N. Setelah dibangun, setiap kombinasi filter dijawab dari tabel kecil
+# ini, tidak lagi dari frame hasil yang bisa berisi ratusan ribu baris.
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+from .hitung import KELAS_KEPATUHAN
+from .indeks import KOLOM_FILTER
+
+KOLOM_OBJEK = ["Nama Op", "Nm Unit", "KLASIFIKASI"]
+KOLOM_NILAI_OBJEK = ["Total Pembayaran", "bulan_pembayaran"]
+URUT_PERINGKAT = ["Total Pembayaran", "Rata-rata Pembayaran"]
+
+
+def mask_pilihan(tabel, pilihan):
+    # Mask baris untuk pilihan sidebar {kolom: [nilai, ...]}; None bila tidak ada filter
+    mask = None
+    for kolom, nilai in pilihan.items():
+        if nilai:
+            cocok = tabel[kolom].isin(nilai).to_numpy()
+            mask = cocok if mask is None else mask & cocok
+    return mask
+
+
+def saring(tabel, pilihan):
+    # Filter tabel kecil (kubus/ringkasan) dengan pilihan sidebar
+    mask = mask_pilihan(tabel, pilihan)
+    return tabel if mask is None else tabel[mask]
+
+
+def _teratas(nilai, n):
+    # Posisi n nilai terbesar, urut menurun; argpartition lalu hanya n itu yang diurutkan
+    if n < len(nilai):
+        posisi = np.argpartition(-nilai, n - 1)[:n]
+    else:
+        posisi = np.arange(len(nilai))
+    return posisi[np.argsort(-nilai[posisi], kind="stable")]
+
+
+def susun_pie(jumlah):
+    # Jumlah objek per kelas -> data pie (kelas kosong dibuang, terbanyak dulu)
+    jumlah = jumlah.reindex(KELAS_KEPATUHAN, fill_value=0)
+    pie_data = pd.DataFrame({"Klasifikasi": jumlah.index.astype(str), "Jumlah": jumlah.to_numpy()})
+    pie_data = pie_data[pie_data["Jumlah"] > 0]
+    return pie_data.sort_values("Jumlah", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def susun_tren(total):
+    # Total per kolom bulan -> data tren bulanan
+    bulanan = pd.DataFrame({"Bulan": pd.to_datetime(total.index), "Total Pembayaran": total.to_numpy()})
+    return bulanan.sort_values("Bulan")
+
+
+def susun_sebaran(total, bins=20):
+    # Histogram total pembayaran per objek, dibin di sini (skala log) supaya yang dikirim
+    # ke browser hanya `bins` batang, berapa pun jumlah objeknya. Objek tanpa pembayaran
+    # dihitung terpisah.
+    positif = total[total > 0]
+    if len(positif):
+        jumlah, tepi = np.histogram(np.log10(positif), bins=bins)
+        tepi = 10 ** tepi
+    else:
+        jumlah, tepi = np.zeros(0, dtype=np.int64), np.ones(1)
+    sebaran = pd.DataFrame({"Batas Bawah": tepi[:-1], "Batas Atas": tepi[1:], "Jumlah Objek": jumlah})
+    return sebaran, int(len(total) - len(positif))
+
+
+def _baris_awal(grup):
+    # Baris pertama tiap nomor grup (0..G-1)
+    _, awal = np.unique(grup, return_index=True)
+    return awal
+
+
+class PeringkatObjek:
+    # Top-N objek dari tabel objek kubus. Kunci objek (Nama Op, Nm Unit, KLASIFIKASI)
+    # dipetakan sekali ke nomor grup; per pilihan filter cukup satu bincount ke array
+    # total per grup (di-memo), lalu N teratas diambil dengan seleksi parsial.
+    def __init__(self, objek, max_memo=16):
+        grup = objek.groupby(KOLOM_OBJEK, observed=True, dropna=False, sort=False)
+        self._grup = grup.ngroup().to_numpy()
+        self.kunci = objek[KOLOM_OBJEK].iloc[_baris_awal(self._grup)].reset_index(drop=True)
+        # Seperti groupby biasa, objek dengan kunci kosong tidak ikut diperingkat
+        self.lengkap = self.kunci.notna().all(axis=1).to_numpy()
+        # Kode unit urut nama, sehingga Top-N per unit keluar berurutan per unit
+        self._unit, _ = pd.factorize(self.kunci["Nm Unit"], sort=True)
+        self._objek = objek
+        self._total = objek["Total Pembayaran"].to_numpy()
+        self._bulan = objek["bulan_pembayaran"].to_numpy()
+        self._memo = LRUCache(max_entries=max_memo)
+
+    @property
+    def nbytes(self):
+        return int(self._grup.nbytes + self._unit.nbytes + self._memo.total_bytes
+                   + self.kunci.memory_usage(deep=True).sum())
+
+    def per_objek(self, pilihan):
+        # (total, bulan bayar, ada) per nomor grup objek untuk pilihan ini
+        key = tuple(sorted((kolom, tuple(nilai)) for kolom, nilai in pilihan.items() if nilai))
+        return self._memo.ambil_atau_buat(key, lambda: self._hitung_per_objek(pilihan))
+
+    def _hitung_per_objek(self, pilihan):
+        mask = mask_pilihan(self._objek, pilihan)
+        grup, total, bulan = self._grup, self._total, self._bulan
+        if mask is not None:
+            grup, total, bulan = grup[mask], total[mask], bulan[mask]
+        jumlah_grup = len(self.kunci)
+        return (
+            np.bincount(grup, weights=total, minlength=jumlah_grup).astype(self._total.dtype),
+            np.bincount(grup, weights=bulan, minlength=jumlah_grup).astype(np.int64),
+            np.bincount(grup, minlength=jumlah_grup) > 0,
+        )
+
+    def top(self, pilihan, n=5, urut="Total Pembayaran", per_unit=False):
+        total, bulan, ada = self.per_objek(pilihan)
+        rata = total / np.where(bulan == 0, 1, bulan)
+        nilai = (total if urut == "Total Pembayaran" else rata).astype(np.float64)
+        calon = np.flatnonzero(ada & self.lengkap)
+        if per_unit:
+            # Seleksi parsial di dalam tiap unit
+            unit = self._unit[calon]
+            posisi = [di_unit[_teratas(nilai[di_unit], n)] for di_unit in (calon[unit == u] for u in np.unique(unit))]
+            posisi = np.concatenate(posisi) if posisi else calon
+        else:
+            posisi = calon[_teratas(nilai[calon], n)]
+        hasil = self.kunci.iloc[posisi].reset_index(drop=True)
+        hasil["Total Pembayaran"] = total[posisi]
+        hasil["Rata-rata Pembayaran"] = rata[posisi]
+        return hasil
+
+
+class KubusRingkasan:
+    def __init__(self, df_output, payment_cols):
+        self.payment_cols = list(payment_cols)
+
+        # Sel: Nm Unit x KLASIFIKASI x STATUS x kelas kepatuhan -> jumlah objek + total per bulan
+        grup = df_output.groupby(KOLOM_FILTER + ["Klasifikasi Kepatuhan"], observed=True, dropna=False)
+        sel = grup[self.payment_cols].sum()
+        sel.insert(0, "Jumlah", grup.size())
+        self.sel = sel.reset_index()
+
+        # Total dan jumlah bulan bayar per objek (dengan STATUS) untuk tabel Top N
+        self.objek = (
+            df_output.groupby(KOLOM_OBJEK + ["STATUS"], observed=True, dropna=False)[KOLOM_NILAI_OBJEK]
+            .sum()
+            .reset_index()
+        )
+        self._peringkat = None
+
+    @classmethod
+    def dari_tabel(cls, sel, objek, payment_cols):
+        # Kubus dari tabel sel/objek yang sudah diagregasi di tempat lain (mis. proses partisi)
+        kubus = cls.__new__(cls)
+        kubus.payment_cols = list(payment_cols)
+        kubus.sel = sel
+        kubus.objek = objek
+        kubus._peringkat = None
+        return kubus
+
+    @classmethod
+    def gabung(cls, bagian):
+        # Gabungkan kubus parsial (mis. per chunk atau per partisi) yang kolom bulannya sama
+        kubus = cls.__new__(cls)
+        kubus.payment_cols = list(bagian[0].payment_cols)
+        kubus.sel = (
+            pd.concat([b.sel for b in bagian], ignore_index=True)
+            .groupby(KOLOM_FILTER + ["Klasifikasi Kepatuhan"], as_index=False, observed=True, dropna=False)
+            .sum()
+        )
+        kubus.objek = (
+            pd.concat([b.objek for b in bagian], ignore_index=True)
+            .groupby(KOLOM_OBJEK + ["STATUS"], as_index=False, observed=True, dropna=False)[KOLOM_NILAI_OBJEK]
+            .sum()
+        )
+        kubus._peringkat = None
+        return kubus
+
+    @property
+    def nbytes(self):
+        peringkat = self._peringkat.nbytes if self._peringkat is not None else 0
+        return int(self.sel.memory_usage(deep=True).sum() + self.objek.memory_usage(deep=True).sum() + peringkat)
+
+    @property
+    def peringkat(self):
+        # Dibangun saat Top-N pertama kali diminta
+        if self._peringkat is None:
+            self._peringkat = PeringkatObjek(self.objek)
+        return self._peringkat
+
+    def data_pie(self, pilihan):
+        jumlah = saring(self.sel, pilihan).groupby("Klasifikasi Kepatuhan", observed=True)["Jumlah"].sum()
+        return susun_pie(jumlah)
+
+    def tren_bulanan(self, pilihan):
+        return susun_tren(saring(self.sel, pilihan)[self.payment_cols].sum())
+
+    def top_objek(self, pilihan, n=5, urut="Total Pembayaran", per_unit=False):
+        return self.peringkat.top(pilihan, n, urut, per_unit)
+
+    def sebaran_total(self, pilihan, bins=20):
+        peringkat = self.peringkat
+        total, _, ada = peringkat.per_objek(pilihan)
+        return susun_sebaran(total[ada & peringkat.lengkap], bins)
+
+
+def ringkasan_antar_tahun(df_multi, pilihan):
+    # Jumlah objek per (tahun, kelas) dan total pembayaran per tahun dari tabel multi-tahun
+    df_multi = saring(df_multi, pilihan)
+    per_kelas = (
+        df_multi.groupby(["Tahun", "Klasifikasi Kepatuhan"], observed=True)
+        .size()
+        .reset_index(name="Jumlah")
+        .rename(columns={"Klasifikasi Kepatuhan": "Klasifikasi"})
+    )
+    per_kelas["Klasifikasi"] = per_kelas["Klasifikasi"].astype(str)
+    per_tahun = df_multi.groupby("Tahun", as_index=False).agg(
+        **{"Total Pembayaran": ("Total Pembayaran", "sum"), "Rata-rata Kepatuhan (%)": ("Kepatuhan (%)", "mean")}
+    )
+    return per_kelas, per_tahun
+
+
+def kubus_cache(df_output, payment_cols, key, cache):
+    key = ("kubus",) + tuple(key)
+    return cache.ambil_atau_buat(key, lambda: KubusRingkasan(df_output, payment_cols))
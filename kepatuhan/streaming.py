@@ -0,0 +1,82 @@
+# Pembacaan workbook sangat besar secara streaming: openpyxl read-only, baris
+# diproses per chunk. Header dinormalisasi sekali, kepatuhan dihitung per chunk,
+# lalu kolom bulan dibuang; yang disimpan hanya kolom ringkas + kubus agregat.
+# Puncak memori ditentukan ukuran chunk, bukan ukuran file.
+from io import BytesIO
+from itertools import islice
+from operator import itemgetter
+
+import pandas as pd
+
+from .hitung import hitung_kepatuhan
+from .kompak import kompakkan
+from .kolom import REQUIRED_COLS, konversi_nama_bulan, normalisasi_nama
+from .ringkasan import KubusRingkasan
+
+UKURAN_CHUNK = 50_000
+
+
+def _posisi_kolom(header, tahun_pajak):
+    # Posisi kolom yang perlu dibaca: semua kolom non-bulan + kolom bulan tahun pajak
+    posisi, nama, terlihat = [], [], set()
+    for i, col in enumerate(header):
+        if col is None:
+            continue
+        label = konversi_nama_bulan(normalisasi_nama(col))
+        if label in terlihat:
+            continue
+        terlihat.add(label)
+        if hasattr(label, "year") and label.year != tahun_pajak:
+            continue
+        posisi.append(i)
+        nama.append(label)
+    return posisi, nama
+
+
+def baca_chunk(sumber, sheet_name, tahun_pajak, ukuran_chunk=UKURAN_CHUNK):
+    # Menghasilkan DataFrame per chunk dengan header yang sudah dinormalisasi. Kolom wajib
+    # diperiksa sekali dari header; sheet tanpa baris data menghasilkan satu frame kosong.
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(sumber, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name is not None else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        posisi, nama = _posisi_kolom(next(rows, None) or (), tahun_pajak)
+        missing_cols = [col for col in REQUIRED_COLS if col not in nama]
+        if missing_cols:
+            raise ValueError(f"Kolom wajib hilang: {', '.join(missing_cols)}")
+        lebar = max(posisi) + 1 if posisi else 0
+        ambil = itemgetter(*posisi) if len(posisi) > 1 else (lambda r: (r[posisi[0]],))
+
+        ada_data = False
+        while True:
+            blok = list(islice(rows, ukuran_chunk))
+            if not blok:
+                break
+            data = [ambil(r if len(r) >= lebar else r + (None,) * (lebar - len(r))) for r in blok if any(r)]
+            if data:
+                ada_data = True
+                yield pd.DataFrame.from_records(data, columns=nama)
+        if not ada_data:
+            yield pd.DataFrame(columns=nama)
+    finally:
+        workbook.close()
+
+
+def muat_streaming(sumber, sheet_name, tahun_pajak, ukuran_chunk=UKURAN_CHUNK):
+    # Mengembalikan (df_ringkas, payment_cols, kubus). df_ringkas berisi semua baris
+    # tetapi tanpa kolom bulan; total per bulan tersimpan di kubus.
+    ringkas, bagian_kubus, payment_cols = [], [], []
+    for chunk in baca_chunk(sumber, sheet_name, tahun_pajak, ukuran_chunk):
+        chunk_output, payment_cols = hitung_kepatuhan(kompakkan(chunk), tahun_pajak)
+        bagian_kubus.append(KubusRingkasan(chunk_output, payment_cols))
+        ringkas.append(chunk_output.drop(columns=payment_cols))
+
+    df_ringkas = kompakkan(pd.concat(ringkas, ignore_index=True))
+    return df_ringkas, payment_cols, KubusRingkasan.gabung(bagian_kubus)
+
+
+def muat_streaming_cache(data, file_hash, sheet_name, tahun_pajak, cache):
+    key = ("stream", file_hash, sheet_name, int(tahun_pajak))
+    return cache.ambil_atau_buat(key, lambda: muat_streaming(BytesIO(data), sheet_name, int(tahun_pajak)))
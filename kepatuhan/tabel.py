@@ -0,0 +1,87 @@
+# Tabel hasil per halaman. Urutan, pencarian dan filter diselesaikan di server sebagai
+# array posisi baris; yang dikirim ke browser hanya potongan satu halaman.
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+
+KOLOM_CARI = "Nama Op"
+UKURAN_HALAMAN = [25, 50, 100, 250]
+
+
+class TabelHalaman:
+    def __init__(self, df, max_memo=32):
+        self.df = df
+        self._urutan = {}
+        self._cocok = LRUCache(max_entries=max_memo)
+        self._memo = LRUCache(max_entries=max_memo)
+
+    @property
+    def nbytes(self):
+        # df milik cache hasil; yang dihitung hanya array urutan/mask yang disimpan di sini
+        return sum(a.nbytes for a in self._urutan.values()) + self._cocok.total_bytes + self._memo.total_bytes
+
+    def urutan(self, kolom, naik=True):
+        # Urutan seluruh frame menurut satu kolom dihitung sekali; filter cukup menyaring array ini
+        key = (kolom, naik)
+        if key not in self._urutan:
+            seri = self.df[kolom].reset_index(drop=True)
+            try:
+                urut = seri.sort_values(ascending=naik, kind="stable", na_position="last")
+            except TypeError:
+                # Kolom object campuran angka dan teks (mis. NOP): diurutkan sebagai teks
+                urut = seri.sort_values(ascending=naik, kind="stable", na_position="last",
+                                        key=lambda s: s.astype(str).where(s.notna()))
+            self._urutan[key] = urut.index.to_numpy()
+        return self._urutan[key]
+
+    def cocok(self, teks):
+        # Mask baris yang Nama Op-nya memuat teks (tanpa beda huruf besar/kecil).
+        # Untuk categorical cukup mencari di daftar kategori, lalu dipetakan lewat kode.
+        teks = teks.strip().lower()
+        return self._cocok.ambil_atau_buat(teks, lambda: self._mask_cocok(teks))
+
+    def _mask_cocok(self, teks):
+        seri = self.df[KOLOM_CARI]
+        if isinstance(seri.dtype, pd.CategoricalDtype):
+            tabel = seri.cat.categories.astype(str).str.lower().str.contains(teks, regex=False)
+            tabel = np.append(np.asarray(tabel, dtype=bool), False)  # kode -1 (NaN) tidak cocok
+            return tabel[seri.cat.codes.to_numpy()]
+        return seri.astype(str).str.lower().str.contains(teks, regex=False).to_numpy(dtype=bool)
+
+    def susun(self, posisi, key_filter, kolom_urut=None, naik=True, cari=""):
+        # posisi: hasil IndeksFilter.cari (None = semua baris). Mengembalikan array posisi
+        # baris sesuai urutan tampilan.
+        key = (key_filter, kolom_urut, naik, cari.strip().lower())
+        return self._memo.ambil_atau_buat(key, lambda: self._susun(posisi, *key[1:]))
+
+    def _susun(self, posisi, kolom_urut, naik, cari):
+        mask = None
+        if posisi is not None:
+            mask = np.zeros(len(self.df), dtype=bool)
+            mask[posisi] = True
+        if cari:
+            mask = self.cocok(cari) if mask is None else mask & self.cocok(cari)
+        if kolom_urut:
+            hasil = self.urutan(kolom_urut, naik)
+            if mask is not None:
+                hasil = hasil[mask[hasil]]
+        elif mask is not None:
+            hasil = np.flatnonzero(mask)
+        else:
+            hasil = np.arange(len(self.df))
+        return hasil
+
+    def halaman(self, susunan, nomor, ukuran):
+        # nomor mulai dari 1
+        awal = (nomor - 1) * ukuran
+        return self.df.iloc[susunan[awal:awal + ukuran]]
+
+
+def jumlah_halaman(n, ukuran):
+    return max(1, -(-n // ukuran))
+
+
+def tabel_halaman_cache(df, key, cache):
+    key = ("tabel",) + tuple(key)
+    return cache.ambil_atau_buat(key, lambda: TabelHalaman(df))
@@ -0,0 +1,102 @@
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kepatuhan.kompak import kompakkan  # noqa: E402
+
+UNIT = ["UPPPD Barat", "UPPPD Timur", "UPPPD Utara", "UPPPD Selatan"]
+KLASIFIKASI = ["Hotel", "Restoran", "Hiburan", "Parkir"]
+STATUS = ["Aktif", "Tutup", "Tutup Sementara"]
+
+# Pilihan filter sidebar untuk uji kesetaraan ringkasan (termasuk unit yang tidak ada)
+PILIHAN = [
+    {},
+    {"Nm Unit": ["UPPPD Barat"]},
+    {"Nm Unit": ["UPPPD Timur"], "KLASIFIKASI": ["Hotel"], "STATUS": ["Aktif", "Tutup Sementara"]},
+    {"KLASIFIKASI": ["Hotel", "Parkir"], "STATUS": ["Aktif"]},
+    {"STATUS": ["Tutup"]},
+    {"Nm Unit": ["UPPPD Tidak Ada"]},
+]
+
+
+@pytest.fixture(autouse=True)
+def cache_disk_sementara(tmp_path, monkeypatch):
+    # Cache Arrow di disk diarahkan ke folder sementara, bukan ~/.cache
+    from kepatuhan import cache
+
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+
+
+@pytest.fixture(autouse=True)
+def arsip_sementara(tmp_path, monkeypatch):
+    # Arsip SQLite diarahkan ke folder sementara, bukan ~/.local/share
+    from kepatuhan import arsip
+
+    monkeypatch.setattr(arsip, "ARSIP_PATH", str(tmp_path / "arsip" / "arsip.sqlite3"))
+
+
+def buat_frame(rows=500, tahun=(2023, 2024, 2025), seed=0, nan_bayar=False):
+    # Frame ternormalisasi (header bulan sudah Timestamp). TMT tersebar sampai setelah
+    # tahun pajak terakhir dan sebagian kosong; nan_bayar mengosongkan sebagian pembayaran.
+    rng = np.random.default_rng(seed)
+    tmt = pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 365 * 9, rows), unit="D")
+    df = pd.DataFrame({
+        "TMT": pd.Series(tmt).where(rng.random(rows) > 0.05),
+        "Nama Op": [f"OP {i:04d}" for i in rng.integers(0, max(rows // 3, 1), rows)],
+        "Nm Unit": rng.choice(UNIT, rows),
+        "KLASIFIKASI": rng.choice(KLASIFIKASI, rows),
+        "STATUS": rng.choice(STATUS, rows, p=[0.8, 0.15, 0.05]),
+    })
+    rajin = rng.random(rows)
+    for th in tahun:
+        for bulan in range(1, 13):
+            bayar = rng.random(rows) < rajin
+            nilai = np.where(bayar, rng.integers(50, 50_000, rows) * 1000, 0)
+            if nan_bayar:
+                nilai = np.where(rng.random(rows) < 0.1, np.nan, nilai)
+            df[pd.Timestamp(th, bulan, 1)] = nilai
+    return df
+
+
+def buat_workbook(sheets):
+    # sheets: {nama sheet: frame}; header bulan ditulis sebagai teks seperti file asli
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
+        for nama, df in sheets.items():
+            df = df.rename(columns=lambda col: col.strftime("%b-%y") if isinstance(col, pd.Timestamp) else col)
+            df.to_excel(writer, index=False, sheet_name=nama)
+    return output.getvalue()
+
+
+def _varian_kompak():
+    return kompakkan(buat_frame(rows=2000, tahun=(2023, 2024), seed=4))
+
+
+def _varian_kunci_kosong():
+    # Kunci object dengan nilai kosong, tanpa kompakkan
+    df = buat_frame(rows=2000, tahun=(2023, 2024), seed=4)
+    df.loc[::13, "Nama Op"] = None
+    df.loc[::19, "Nm Unit"] = None
+    return df
+
+
+def _varian_bayar_float():
+    return kompakkan(buat_frame(rows=2000, tahun=(2024,), nan_bayar=True, seed=5))
+
+
+@pytest.fixture(params=[_varian_kompak, _varian_kunci_kosong, _varian_bayar_float],
+                ids=["kompak", "kunci_kosong", "bayar_float"])
+def frame_varian(request):
+    # Frame input untuk uji kesetaraan jalur alternatif dengan hitung_kepatuhan + KubusRingkasan
+    return request.param()
+
+
+@pytest.fixture(params=PILIHAN, ids=lambda pilihan: "-".join(pilihan) or "semua")
+def pilihan(request):
+    return request.param
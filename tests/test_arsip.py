@@ -0,0 +1,65 @@
+import sqlite3
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+from conftest import buat_frame
+from kepatuhan import arsip
+from kepatuhan.kompak import kompakkan
+
+pytest.importorskip("pyarrow")
+
+
+def _jumlah(tabel):
+    with closing(sqlite3.connect(arsip.ARSIP_PATH)) as conn:
+        return dict(conn.execute(f"SELECT workbook_id, count(*) FROM {tabel} GROUP BY workbook_id").fetchall())
+
+
+def _batch():
+    bagian = [buat_frame(rows=120, tahun=(2024,), seed=seed).assign(**{"Sumber File": f"{nama}.xlsx",
+                                                                       "Sumber Sheet": "Sheet1"})
+              for seed, nama in enumerate(["barat", "timur"])]
+    return kompakkan(pd.concat(bagian, ignore_index=True))
+
+
+@pytest.mark.parametrize("sheet, siapkan", [("Data", lambda: kompakkan(buat_frame(rows=300))), (None, _batch)])
+def test_simpan_lalu_muat(sheet, siapkan):
+    df = siapkan()
+    assert arsip.muat("h1", sheet) is None
+    assert arsip.simpan(df, "h1", sheet, "rekap.xlsx")
+    assert arsip.ada("h1", sheet)
+
+    pd.testing.assert_frame_equal(arsip.muat("h1", sheet), df)
+    riwayat = arsip.daftar()
+    assert riwayat[["file_hash", "sheet", "nama", "baris"]].values.tolist() == [
+        ["h1", sheet or "", "rekap.xlsx", len(df)]]
+    tahun = sorted({col.year for col in df.columns if isinstance(col, pd.Timestamp)})
+    assert riwayat.loc[0, "tahun"] == ",".join(map(str, tahun))
+
+    workbook_id, = _jumlah("objek")
+    assert _jumlah("objek") == {workbook_id: len(df)}
+    assert _jumlah("kepatuhan") == {workbook_id: len(df) * len(tahun)}
+
+
+def test_ganti_menghapus_baris_lama():
+    lama, baru = kompakkan(buat_frame(rows=300, seed=1)), kompakkan(buat_frame(rows=80, tahun=(2024,), seed=2))
+    arsip.simpan(lama, "h1", "Data", "rekap.xlsx")
+    arsip.simpan(kompakkan(buat_frame(rows=50, seed=3)), "h2", "Data", "lain.xlsx")
+
+    # Tanpa ganti, entri yang sudah ada dibiarkan
+    assert arsip.simpan(baru, "h1", "Data", "rekap.xlsx")
+    pd.testing.assert_frame_equal(arsip.muat("h1", "Data"), lama)
+
+    assert arsip.simpan(baru, "h1", "Data", "rekap v2.xlsx", ganti=True)
+    pd.testing.assert_frame_equal(arsip.muat("h1", "Data"), baru)
+    riwayat = arsip.daftar().set_index("file_hash")
+    assert len(riwayat) == 2
+    assert riwayat.loc["h1", "nama"] == "rekap v2.xlsx"
+
+    # ON DELETE CASCADE: baris objek/kepatuhan dari entri lama ikut terhapus
+    with closing(sqlite3.connect(arsip.ARSIP_PATH)) as conn:
+        id_baru, = conn.execute("SELECT id FROM workbook WHERE file_hash = 'h1'").fetchone()
+        id_lain, = conn.execute("SELECT id FROM workbook WHERE file_hash = 'h2'").fetchone()
+    assert _jumlah("objek") == {id_baru: 80, id_lain: 50}
+    assert _jumlah("kepatuhan") == {id_baru: 80, id_lain: 50 * 3}
@@ -0,0 +1,91 @@
+import threading
+import time
+
+import numpy as np
+
+from kepatuhan.cache import LRUCache
+
+
+def test_buang_menurut_jumlah_entri():
+    cache = LRUCache(max_entries=3)
+    for key in "abc":
+        cache.put(key, np.zeros(1))
+    cache.get("a")  # a baru dipakai, b paling lama
+    cache.put("d", np.zeros(1))
+    assert "b" not in cache
+    assert [key in cache for key in "acd"] == [True, True, True]
+    assert len(cache) == 3
+
+
+def test_buang_menurut_byte():
+    cache = LRUCache(max_entries=10, max_bytes=2500)
+    cache.put("a", np.zeros(100))  # 800 byte
+    cache.put("b", np.zeros(100))
+    cache.put("c", np.zeros(100))
+    assert cache.total_bytes == 2400
+    cache.put("d", np.zeros(50))
+    assert "a" not in cache and cache.total_bytes == 2000
+
+    # Mengganti entri yang sama tidak menghitung byte dua kali
+    cache.put("d", np.zeros(10))
+    assert cache.total_bytes == 1680
+    cache.pop("b")
+    assert cache.total_bytes == 880
+
+
+def test_entri_terbaru_tetap_walau_melebihi_batas():
+    cache = LRUCache(max_entries=10, max_bytes=1000)
+    cache.put("kecil", np.zeros(10))
+    cache.put("besar", np.zeros(1000))
+    assert list(cache._data) == ["besar"]
+    assert cache.total_bytes == 8000
+    cache.put("kecil", np.zeros(10))
+    assert list(cache._data) == ["kecil"]
+    assert cache.total_bytes == 80
+
+
+def test_ambil_atau_buat_sekali_untuk_banyak_thread():
+    cache = LRUCache(max_entries=4)
+    panggilan = []
+    mulai = threading.Barrier(20)
+    hasil = [None] * 20
+
+    def buat():
+        panggilan.append(threading.get_ident())
+        time.sleep(0.05)
+        return np.arange(10)
+
+    def minta(i):
+        mulai.wait()
+        hasil[i] = cache.ambil_atau_buat("sheet", buat)
+
+    threads = [threading.Thread(target=minta, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(panggilan) == 1
+    assert all(nilai is hasil[0] for nilai in hasil)
+    assert cache._sedang_dibuat == {}
+
+
+def test_byte_tetap_cocok_saat_put_get_bersamaan():
+    cache = LRUCache(max_entries=5, max_bytes=10_000)
+
+    def kerja(seed):
+        rng = np.random.default_rng(seed)
+        for _ in range(300):
+            key = int(rng.integers(0, 12))
+            if rng.random() < 0.5:
+                cache.put(key, np.zeros(int(rng.integers(1, 400))))
+            else:
+                cache.get(key)
+
+    threads = [threading.Thread(target=kerja, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.total_bytes == sum(nilai.nbytes for nilai in cache._data.values())
+    assert len(cache) <= 5
+    assert cache.total_bytes <= 10_000 or len(cache) == 1
@@ -0,0 +1,28 @@
+from io import BytesIO
+
+import pandas as pd
+
+from conftest import buat_frame
+from kepatuhan import ekspor
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.kolom import label_kolom
+
+
+def test_isi_sama_lintas_potongan(monkeypatch):
+    # Potongan kecil supaya batas antar potongan ikut teruji
+    monkeypatch.setattr(ekspor, "BARIS_PER_POTONGAN", 7)
+    df, _ = hitung_kepatuhan(buat_frame(rows=50, tahun=(2024,), nan_bayar=True), 2024)
+    hasil = pd.read_excel(BytesIO(ekspor.ekspor_excel(df)))
+
+    assert list(hasil.columns) == [label_kolom(col) for col in df.columns]
+    assert len(hasil) == len(df)
+    pd.testing.assert_series_equal(hasil["Nama Op"], df["Nama Op"].astype(object), check_dtype=False)
+    pd.testing.assert_series_equal(hasil["Total Pembayaran"], df["Total Pembayaran"], check_dtype=False)
+    assert hasil["TMT"].isna().tolist() == df["TMT"].isna().tolist()
+    assert hasil["Klasifikasi Kepatuhan"].tolist() == df["Klasifikasi Kepatuhan"].astype(str).tolist()
+
+
+def test_frame_kosong():
+    df = buat_frame(rows=5, tahun=(2024,)).iloc[:0]
+    hasil = pd.read_excel(BytesIO(ekspor.ekspor_excel(df)))
+    assert hasil.empty and len(hasil.columns) == len(df.columns)
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import buat_frame
+from kepatuhan.hitung import KOLOM_OBJEK_MULTI, hitung_kepatuhan, hitung_kepatuhan_multi
+from kepatuhan.kompak import kompakkan
+
+KOLOM_HASIL = ["Total Pembayaran", "bulan_aktif", "bulan_pembayaran", "Rata-rata Pembayaran", "Kepatuhan (%)",
+               "Klasifikasi Kepatuhan"]
+
+
+def hitung_kepatuhan_lama(df, tahun_pajak):
+    # Versi baris-per-baris (apply) sebelum divektorkan, sebagai acuan
+    df = df.copy()
+    df['TMT'] = pd.to_datetime(df['TMT'], errors='coerce')
+    payment_cols = [col for col in df.columns if isinstance(col, pd.Timestamp) and col.year == tahun_pajak]
+
+    total_pembayaran = df[payment_cols].sum(axis=1)
+
+    def hitung_bulan_aktif(tmt):
+        if pd.isna(tmt): return 0
+        if tmt.year < tahun_pajak: return 12
+        elif tmt.year > tahun_pajak: return 0
+        else: return 12 - tmt.month + 1
+
+    bulan_aktif = df['TMT'].apply(hitung_bulan_aktif)
+    bulan_pembayaran = df[payment_cols].gt(0).sum(axis=1)
+    rata_rata_pembayaran = total_pembayaran / bulan_pembayaran.replace(0, 1)
+    kepatuhan_persen = bulan_pembayaran / bulan_aktif.replace(0, 1) * 100
+
+    def klasifikasi(row):
+        if row['bulan_aktif'] == 0 and row['bulan_pembayaran'] == 0:
+            return "Belum Aktif"
+        elif row['bulan_pembayaran'] == row['bulan_aktif']:
+            return "Patuh"
+        elif row['bulan_aktif'] - row['bulan_pembayaran'] <= 3:
+            return "Kurang Patuh"
+        else:
+            return "Tidak Patuh"
+
+    df["Total Pembayaran"] = total_pembayaran
+    df["bulan_aktif"] = bulan_aktif
+    df["bulan_pembayaran"] = bulan_pembayaran
+    df["Rata-rata Pembayaran"] = rata_rata_pembayaran
+    df["Kepatuhan (%)"] = kepatuhan_persen
+    df["Klasifikasi Kepatuhan"] = df.apply(klasifikasi, axis=1)
+    return df, payment_cols
+
+
+@pytest.mark.parametrize("nan_bayar", [False, True])
+@pytest.mark.parametrize("tahun_pajak", [2019, 2023, 2024, 2025, 2030])
+def test_sama_dengan_versi_apply(tahun_pajak, nan_bayar):
+    df = buat_frame(nan_bayar=nan_bayar)
+    # TMT setelah tahun pajak, TMT kosong dan TMT di bulan terakhir tahun pajak
+    df.loc[0, "TMT"] = pd.Timestamp(tahun_pajak + 1, 3, 1)
+    df.loc[1, "TMT"] = pd.NaT
+    df.loc[2, "TMT"] = pd.Timestamp(tahun_pajak, 12, 15)
+    lama, cols_lama = hitung_kepatuhan_lama(df, tahun_pajak)
+    baru, cols_baru = hitung_kepatuhan(df.copy(), tahun_pajak)
+
+    assert cols_baru == cols_lama
+    for kolom in KOLOM_HASIL[:-1]:
+        np.testing.assert_allclose(baru[kolom].to_numpy(np.float64), lama[kolom].to_numpy(np.float64), err_msg=kolom)
+    assert baru["Klasifikasi Kepatuhan"].astype(str).tolist() == lama["Klasifikasi Kepatuhan"].tolist()
+
+
+def test_tmt_teks_tidak_valid():
+    df = buat_frame(rows=50, tahun=(2024,))
+    df["TMT"] = df["TMT"].dt.strftime("%Y-%m-%d").where(df["TMT"].notna(), "bukan tanggal")
+    lama, _ = hitung_kepatuhan_lama(df, 2024)
+    baru, _ = hitung_kepatuhan(df.copy(), 2024)
+    assert baru["bulan_aktif"].tolist() == lama["bulan_aktif"].tolist()
+    assert baru["Klasifikasi Kepatuhan"].astype(str).tolist() == lama["Klasifikasi Kepatuhan"].tolist()
+
+
+@pytest.mark.parametrize("kompak", [False, True])
+@pytest.mark.parametrize("nan_bayar", [False, True])
+def test_multi_sama_dengan_per_tahun(nan_bayar, kompak):
+    df = buat_frame(tahun=(2022, 2023, 2024, 2025), nan_bayar=nan_bayar, seed=4)
+    df.loc[0, "TMT"] = pd.Timestamp(2026, 3, 1)
+    df.loc[1, "TMT"] = pd.NaT
+    if kompak:
+        df = kompakkan(df)
+    multi = hitung_kepatuhan_multi(df)
+    assert sorted(multi["Tahun"].unique()) == [2022, 2023, 2024, 2025]
+    assert len(multi) == 4 * len(df)
+
+    for tahun, potongan in multi.groupby("Tahun", sort=True):
+        acuan, _ = hitung_kepatuhan(df.copy(deep=False), tahun)
+        potongan = potongan.reset_index(drop=True)
+        for kolom in [col for col in KOLOM_OBJEK_MULTI if col in df.columns]:
+            assert potongan[kolom].astype(str).tolist() == acuan[kolom].astype(str).tolist(), kolom
+        for kolom in KOLOM_HASIL[:-1]:
+            np.testing.assert_allclose(potongan[kolom].to_numpy(np.float64), acuan[kolom].to_numpy(np.float64),
+                                       err_msg=f"{tahun} {kolom}")
+        assert (potongan["Klasifikasi Kepatuhan"].astype(str).tolist()
+                == acuan["Klasifikasi Kepatuhan"].astype(str).tolist())
+
+
+def test_multi_tanpa_kolom_bulan():
+    df = buat_frame(rows=10, tahun=())
+    assert hitung_kepatuhan_multi(df).empty
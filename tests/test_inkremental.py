@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+
+from conftest import buat_frame
+from kepatuhan.cache import LRUCache
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.inkremental import hitung_kepatuhan_inkremental_cache, perbarui_kepatuhan
+from kepatuhan.kompak import kompakkan
+
+KOLOM_HASIL = ["TMT", "Total Pembayaran", "bulan_aktif", "bulan_pembayaran", "Rata-rata Pembayaran", "Kepatuhan (%)",
+               "Klasifikasi Kepatuhan"]
+
+
+def versi(df, sampai_bulan):
+    # Workbook bulan berjalan: kolom 2024 hanya sampai bulan tertentu
+    buang = [col for col in df.columns if isinstance(col, pd.Timestamp) and col.year == 2024 and col.month > sampai_bulan]
+    return df.drop(columns=buang)
+
+
+def sama_dengan_hitung_penuh(df_hasil, payment_cols, df_baru):
+    penuh, cols_penuh = hitung_kepatuhan(df_baru.copy(deep=False), 2024)
+    assert payment_cols == cols_penuh
+    for kolom in KOLOM_HASIL:
+        pd.testing.assert_series_equal(df_hasil[kolom], penuh[kolom], check_dtype=False, obj=kolom)
+
+
+@pytest.fixture
+def dasar():
+    df = buat_frame(rows=400, tahun=(2023, 2024), nan_bayar=True, seed=3)
+    # Kunci unik per objek seperti rekap bulanan
+    df["Nama Op"] = [f"OP {i:04d}" for i in range(len(df))]
+    return df
+
+
+def test_hanya_bulan_baru(dasar):
+    lama = kompakkan(versi(dasar, 6))
+    baru = kompakkan(versi(dasar, 7))
+    df_lama, cols_lama = hitung_kepatuhan(lama.copy(deep=False), 2024)
+    df_hasil, payment_cols, info = perbarui_kepatuhan(df_lama, cols_lama, baru, 2024)
+    assert info == {"baris_baru": 0, "baris_berubah": 0, "baris_dihapus": 0, "bulan_baru": 1}
+    sama_dengan_hitung_penuh(df_hasil, payment_cols, baru)
+
+
+def test_objek_baru_berubah_dan_dihapus(dasar):
+    lama = versi(dasar, 6)
+    baru = versi(dasar, 7).copy()
+    baru.loc[5, pd.Timestamp(2024, 3, 1)] = 123_000  # pembayaran lama dikoreksi
+    baru.loc[6, "TMT"] = pd.Timestamp(2024, 5, 1)
+    baru.loc[7, "STATUS"] = "Tutup"
+    tambahan = baru.iloc[:3].assign(**{"Nama Op": ["OP BARU 1", "OP BARU 2", "OP BARU 3"]})
+    baru = pd.concat([baru.drop(index=[10, 11]), tambahan], ignore_index=True).sample(frac=1, random_state=0)
+    lama, baru = kompakkan(lama), kompakkan(baru.reset_index(drop=True))
+
+    df_lama, cols_lama = hitung_kepatuhan(lama.copy(deep=False), 2024)
+    df_hasil, payment_cols, info = perbarui_kepatuhan(df_lama, cols_lama, baru, 2024)
+    assert info["baris_baru"] == 3 and info["baris_dihapus"] == 2 and info["bulan_baru"] == 1
+    assert info["baris_berubah"] >= 2
+    sama_dengan_hitung_penuh(df_hasil, payment_cols, baru)
+
+
+def test_dihitung_penuh_bila_tidak_bisa_diperbarui(dasar):
+    lama = kompakkan(versi(dasar, 7))
+    df_lama, cols_lama = hitung_kepatuhan(lama.copy(deep=False), 2024)
+    # Kolom bulan hilang
+    assert perbarui_kepatuhan(df_lama, cols_lama, kompakkan(versi(dasar, 6)), 2024) is None
+    # Kunci ganda
+    ganda = versi(dasar, 8).assign(**{"Nama Op": "OP SAMA", "Nm Unit": "UPPPD Barat"})
+    assert perbarui_kepatuhan(df_lama, cols_lama, kompakkan(ganda), 2024) is None
+
+
+def test_cache_memakai_upload_sebelumnya(dasar):
+    cache = LRUCache(max_entries=16)
+    lama, baru = kompakkan(versi(dasar, 6)), kompakkan(versi(dasar, 7))
+    *_, info = hitung_kepatuhan_inkremental_cache(lama, "h1", "Data", 2024, cache, "rekap.xlsx")
+    assert info is None
+    df_hasil, payment_cols, info = hitung_kepatuhan_inkremental_cache(baru, "h2", "Data", 2024, cache, "rekap.xlsx")
+    assert info["bulan_baru"] == 1
+    sama_dengan_hitung_penuh(df_hasil, payment_cols, baru)
+
+
+def test_workbook_lain_dengan_sheet_sama(dasar):
+    # Dua pengguna bergantian meng-upload workbook berbeda yang sama-sama punya "Sheet1"
+    cache = LRUCache(max_entries=16)
+    lain = buat_frame(rows=300, tahun=(2023, 2024), seed=9)
+    hitung_kepatuhan_inkremental_cache(kompakkan(versi(dasar, 6)), "a6", "Sheet1", 2024, cache, "barat.xlsx")
+    *_, info = hitung_kepatuhan_inkremental_cache(kompakkan(lain), "b", "Sheet1", 2024, cache, "timur.xlsx")
+    assert info is None
+    baru = kompakkan(versi(dasar, 7))
+    df_hasil, payment_cols, info = hitung_kepatuhan_inkremental_cache(baru, "a7", "Sheet1", 2024, cache, "barat.xlsx")
+    assert info["bulan_baru"] == 1
+    sama_dengan_hitung_penuh(df_hasil, payment_cols, baru)
@@ -0,0 +1,77 @@
+import threading
+import tracemalloc
+
+import numpy as np
+
+from kepatuhan.instrumen import Instrumen
+
+
+def test_tahap_tunggal():
+    instrumen = Instrumen(aktif=True)
+    with instrumen.ukur("hitung") as info:
+        data = np.ones(4 * 1024 ** 2)  # 32 MB
+        info["rows"] = len(data)
+    del data
+    catatan, = instrumen.catatan
+    assert catatan["puncak_mb"] >= 30
+    assert "puncak_perkiraan" not in catatan
+    assert not tracemalloc.is_tracing()
+
+
+def test_tahap_tumpang_tindih_antar_thread():
+    # Tahap di thread latar mulai dan selesai di dalam tahap tampilan
+    tampilan, latar = Instrumen(aktif=True), Instrumen(aktif=True)
+    mulai, selesai = threading.Event(), threading.Event()
+
+    def kerja():
+        mulai.wait()
+        with latar.ukur("parsing"):
+            data = np.ones(6 * 1024 ** 2)  # 48 MB
+            del data
+        selesai.set()
+
+    thread = threading.Thread(target=kerja)
+    thread.start()
+    with tampilan.ukur("grafik"):
+        mulai.set()
+        selesai.wait()
+    thread.join()
+
+    parsing, = latar.catatan
+    grafik, = tampilan.catatan
+    # Tracing tidak dimatikan dan puncak tidak di-reset oleh tahap lain
+    assert parsing["puncak_mb"] >= 45
+    assert parsing["puncak_perkiraan"] and grafik["puncak_perkiraan"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_tahap_lain_selesai_lebih_dulu():
+    # Tahap tampilan yang menyalakan tracing selesai saat tahap latar masih berjalan
+    tampilan, latar = Instrumen(aktif=True), Instrumen(aktif=True)
+    sudah_alokasi, tampilan_selesai = threading.Event(), threading.Event()
+
+    def kerja():
+        with latar.ukur("kepatuhan"):
+            data = np.ones(6 * 1024 ** 2)  # 48 MB
+            sudah_alokasi.set()
+            tampilan_selesai.wait()
+            del data
+
+    with tampilan.ukur("grafik"):
+        thread = threading.Thread(target=kerja)
+        thread.start()
+        sudah_alokasi.wait()
+    tampilan_selesai.set()
+    thread.join()
+
+    kepatuhan, = latar.catatan
+    assert kepatuhan["puncak_mb"] >= 45
+    assert kepatuhan["puncak_perkiraan"]
+    assert not tracemalloc.is_tracing()
+
+
+def test_tidak_aktif():
+    instrumen = Instrumen()
+    with instrumen.ukur("hitung") as info:
+        info["rows"] = 1
+    assert instrumen.catatan == []
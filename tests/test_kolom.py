@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from kepatuhan.kolom import klasifikasi_header, konversi_kolom_bulan, normalisasi_kolom
+
+
+@pytest.mark.parametrize("header, harapan", [
+    # Format lama (%b-%y dan %b %Y)
+    ("Jan-24", (2024, 1)),
+    ("Dec-23", (2023, 12)),
+    ("Mar 2024", (2024, 3)),
+    ("Sep 2025", (2025, 9)),
+    # Nama dan singkatan Indonesia
+    ("Mei-24", (2024, 5)),
+    ("Agt-24", (2024, 8)),
+    ("Agu 2024", (2024, 8)),
+    ("Ags.24", (2024, 8)),
+    ("Agustus 2024", (2024, 8)),
+    ("Okt-24", (2024, 10)),
+    ("Nop-24", (2024, 11)),
+    ("Nopember 2024", (2024, 11)),
+    ("Des '24", (2024, 12)),
+    ("Pebruari 2024", (2024, 2)),
+    ("peb-24", (2024, 2)),
+    # Batas tahun dua digit (aturan %y)
+    ("Jan-68", (2068, 1)),
+    ("Jan-69", (1969, 1)),
+    ("Jan-00", (2000, 1)),
+    # Header tanggal yang sudah menjadi teks
+    ("2024-01-01", (2024, 1)),
+    ("2024-12-01 00:00:00", (2024, 12)),
+    ("2024-07-01T00:00", (2024, 7)),
+    (datetime(2024, 4, 1), (2024, 4)),
+    # Bukan kolom bulan
+    ("nop", None),
+    ("total 2024", None),
+    ("mar 2024 (rp)", None),
+    ("nama op", None),
+    ("tmt", None),
+    ("2024-13-01", None),
+    ("jan-2024-01", None),
+    ("24", None),
+    (2024, None),
+])
+def test_klasifikasi_header(header, harapan):
+    assert klasifikasi_header(header) == harapan
+
+
+def test_konversi_setelah_normalisasi():
+    df = pd.DataFrame(columns=["TMT", "Nama_OP", "Nop", "Jan-24", "Agt.24", "Des 2024", "Total 2024",
+                               datetime(2024, 2, 1)])
+    kolom = list(konversi_kolom_bulan(normalisasi_kolom(df)).columns)
+    assert kolom == ["TMT", "Nama Op", "nop", pd.Timestamp(2024, 1, 1), pd.Timestamp(2024, 8, 1),
+                     pd.Timestamp(2024, 12, 1), "total 2024", pd.Timestamp(2024, 2, 1)]
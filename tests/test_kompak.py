@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from conftest import buat_frame
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.kompak import kompakkan
+
+
+def test_bayar_bulat_jadi_int64():
+    df = buat_frame(rows=100, tahun=(2024,), nan_bayar=True)
+    hasil = kompakkan(df)
+    cols = [col for col in df.columns if isinstance(col, pd.Timestamp)]
+    assert (hasil[cols].dtypes == np.int64).all()
+    assert hasil[cols].sum().tolist() == df[cols].fillna(0).sum().astype(np.int64).tolist()
+
+
+def test_bayar_pecahan_tidak_dibulatkan():
+    # Nilai dalam jutaan rupiah: 0,4 juta tetap dihitung sebagai bulan bayar
+    df = buat_frame(rows=200, tahun=(2024,), nan_bayar=True, seed=3)
+    cols = [col for col in df.columns if isinstance(col, pd.Timestamp)]
+    df[cols] = df[cols] / 1_000_000
+    df.loc[0, cols] = 0.4
+    hasil = kompakkan(df)
+    assert (hasil[cols].dtypes == np.float64).all()
+
+    lama, _ = hitung_kepatuhan(df.copy(), 2024)
+    baru, _ = hitung_kepatuhan(hasil, 2024)
+    assert baru.loc[0, "bulan_pembayaran"] == 12
+    assert baru.loc[0, "Klasifikasi Kepatuhan"] == lama.loc[0, "Klasifikasi Kepatuhan"]
+    for kolom in ["Total Pembayaran", "bulan_pembayaran", "Rata-rata Pembayaran", "Kepatuhan (%)"]:
+        np.testing.assert_allclose(baru[kolom].to_numpy(np.float64), lama[kolom].to_numpy(np.float64), err_msg=kolom)
+    assert baru["Klasifikasi Kepatuhan"].astype(str).tolist() == lama["Klasifikasi Kepatuhan"].astype(str).tolist()
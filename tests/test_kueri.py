@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PILIHAN
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.indeks import IndeksFilter
+from kepatuhan.ringkasan import KubusRingkasan
+
+pytest.importorskip("duckdb")
+
+from kepatuhan.kueri import KueriDuckDB  # noqa: E402
+
+
+def test_sama_dengan_jalur_pandas(frame_varian):
+    df = frame_varian
+    df_hasil, payment_cols = hitung_kepatuhan(df, 2024)
+    kueri = KueriDuckDB(df_hasil, payment_cols)
+    indeks, kubus = IndeksFilter(df_hasil), KubusRingkasan(df_hasil, payment_cols)
+
+    for pilihan in PILIHAN:
+        for kolom in ["Nm Unit", "KLASIFIKASI", "STATUS"]:
+            assert kueri.opsi(kolom, pilihan) == indeks.opsi(kolom, pilihan)
+        posisi, acuan = kueri.cari(pilihan), indeks.cari(pilihan)
+        assert (posisi is None and acuan is None) or np.array_equal(posisi, acuan)
+
+        pd.testing.assert_frame_equal(kueri.data_pie(pilihan), kubus.data_pie(pilihan))
+        pd.testing.assert_frame_equal(kueri.tren_bulanan(pilihan), kubus.tren_bulanan(pilihan), check_dtype=False)
+        for urut, per_unit, n in itertools.product(["Total Pembayaran", "Rata-rata Pembayaran"], [False, True], [1, 5]):
+            top, top_acuan = kueri.top_objek(pilihan, n, urut, per_unit), kubus.top_objek(pilihan, n, urut, per_unit)
+            assert len(top) == len(top_acuan)
+            np.testing.assert_allclose(top[urut].to_numpy(np.float64), top_acuan[urut].to_numpy(np.float64))
+            assert top["Nm Unit"].astype(str).tolist() == top_acuan["Nm Unit"].astype(str).tolist()
+        sebaran, tanpa = kueri.sebaran_total(pilihan)
+        sebaran_acuan, tanpa_acuan = kubus.sebaran_total(pilihan)
+        assert tanpa == tanpa_acuan
+        pd.testing.assert_frame_equal(sebaran, sebaran_acuan)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PILIHAN
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.partisi import buat_pool, hitung_kepatuhan_partisi
+from kepatuhan.ringkasan import KubusRingkasan
+
+KOLOM_HASIL = ["TMT", "Total Pembayaran", "bulan_aktif", "bulan_pembayaran", "Rata-rata Pembayaran", "Kepatuhan (%)",
+               "Klasifikasi Kepatuhan"]
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = buat_pool(2)
+    yield pool
+    pool.shutdown()
+
+
+def test_sama_dengan_sekali_jalan(pool, frame_varian):
+    df = frame_varian
+    df_hasil, payment_cols, kubus = hitung_kepatuhan_partisi(df, 2024, pool, jumlah_shard=3)
+    acuan, cols_acuan = hitung_kepatuhan(df.copy(deep=False), 2024)
+    kubus_acuan = KubusRingkasan(acuan, cols_acuan)
+
+    assert payment_cols == cols_acuan
+    for kolom in KOLOM_HASIL:
+        pd.testing.assert_series_equal(df_hasil[kolom], acuan[kolom], check_dtype=False, obj=kolom)
+    for pilihan in PILIHAN:
+        pd.testing.assert_frame_equal(kubus.data_pie(pilihan), kubus_acuan.data_pie(pilihan))
+        pd.testing.assert_frame_equal(kubus.tren_bulanan(pilihan), kubus_acuan.tren_bulanan(pilihan),
+                                      check_dtype=False)
+        top, top_acuan = kubus.top_objek(pilihan, 10), kubus_acuan.top_objek(pilihan, 10)
+        np.testing.assert_allclose(top["Total Pembayaran"], top_acuan["Total Pembayaran"])
+        assert top["Nama Op"].astype(str).tolist() == top_acuan["Nama Op"].astype(str).tolist()
+        sebaran, tanpa = kubus.sebaran_total(pilihan)
+        sebaran_acuan, tanpa_acuan = kubus_acuan.sebaran_total(pilihan)
+        assert tanpa == tanpa_acuan
+        pd.testing.assert_frame_equal(sebaran, sebaran_acuan)
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from conftest import buat_frame, buat_workbook
+from kepatuhan.pemuatan import muat_batch, muat_sheet_disk
+
+
+def test_batch_lewati_sheet_tanpa_kolom_wajib():
+    data = buat_frame(rows=30, tahun=(2024,))
+    rekap = pd.DataFrame({"Keterangan": ["Barat", "Timur"], "Total": [1, 2]})
+    files = [("a.xlsx", buat_workbook({"Data": data, "Rekap": rekap, "Kosong": pd.DataFrame()})),
+             ("b.xlsx", buat_workbook({"Data": data.head(10)}))]
+
+    df = muat_batch(files, max_workers=1)
+
+    assert len(df) == 40
+    assert set(map(tuple, df[["Sumber File", "Sumber Sheet"]].drop_duplicates().to_numpy())) == {
+        ("a.xlsx", "Data"), ("b.xlsx", "Data")}
+    assert df.attrs["sheet_dilewati"] == [
+        "a.xlsx [Rekap]: dilewati, kolom wajib hilang: TMT, Nama Op, Nm Unit, KLASIFIKASI, STATUS"]
+
+
+def test_batch_tanpa_sheet_valid():
+    files = [("rekap.xlsx", buat_workbook({"Rekap": pd.DataFrame({"Total": [1]})}))]
+    df = muat_batch(files, max_workers=1)
+    assert df.empty
+    assert len(df.attrs["sheet_dilewati"]) == 1
+
+
+def test_waktu_baca_dan_deteksi_bulan_dicatat():
+    data = buat_workbook({"Data": buat_frame(rows=30, tahun=(2024,))})
+    df = muat_sheet_disk(data, "h1", "Data")
+    assert set(df.attrs["laporan_waktu"]) == {"baca_excel_detik", "deteksi_bulan_detik", "kompak_detik",
+                                              "tulis_cache_detik"}
+    # Dari cache Arrow di disk: tanpa baca Excel maupun deteksi bulan
+    assert set(muat_sheet_disk(data, "h1", "Data").attrs["laporan_waktu"]) == {"cache_disk_detik"}
+
+    df = muat_batch([("a.xlsx", data), ("b.xlsx", buat_workbook({"Data": buat_frame(rows=5)}))], max_workers=1)
+    assert {"baca_excel_detik", "deteksi_bulan_detik", "kompak_detik"} <= set(df.attrs["laporan_waktu"])
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import PILIHAN, buat_frame
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.kompak import kompakkan
+from kepatuhan.ringkasan import KubusRingkasan
+
+
+# Versi sebelum kubus: dihitung langsung dari frame hasil yang sudah difilter
+def data_pie_lama(df):
+    pie_data = df["Klasifikasi Kepatuhan"].value_counts().reset_index()
+    pie_data.columns = ["Klasifikasi", "Jumlah"]
+    return pie_data[pie_data["Jumlah"] > 0]
+
+
+def tren_bulanan_lama(df, payment_cols):
+    bulanan = df[payment_cols].sum().reset_index()
+    bulanan.columns = ["Bulan", "Total Pembayaran"]
+    bulanan["Bulan"] = pd.to_datetime(bulanan["Bulan"])
+    return bulanan.sort_values("Bulan")
+
+
+def top_objek_lama(df, n=5):
+    return (
+        df[["Nama Op", "Total Pembayaran", "Nm Unit", "KLASIFIKASI"]]
+        .groupby(["Nama Op", "Nm Unit", "KLASIFIKASI"], as_index=False, observed=True)
+        .sum()
+        .sort_values("Total Pembayaran", ascending=False)
+        .head(n)
+    )
+
+
+def saring_lama(df, pilihan):
+    mask = np.ones(len(df), dtype=bool)
+    for kolom, nilai in pilihan.items():
+        if nilai:
+            mask &= df[kolom].isin(nilai).to_numpy()
+    return df[mask]
+
+
+@pytest.fixture(scope="module")
+def hasil():
+    df = buat_frame(rows=3000, seed=1)
+    # Unit dan status kosong ikut diuji
+    df.loc[::17, "Nm Unit"] = None
+    df.loc[::23, "STATUS"] = None
+    return hitung_kepatuhan(kompakkan(df), 2024)
+
+
+def test_kubus_sama_dengan_frame(hasil, pilihan):
+    df_output, payment_cols = hasil
+    kubus = KubusRingkasan(df_output, payment_cols)
+    df = saring_lama(df_output, pilihan)
+
+    pie, pie_lama = kubus.data_pie(pilihan), data_pie_lama(df)
+    assert dict(zip(pie["Klasifikasi"], pie["Jumlah"])) == \
+        dict(zip(pie_lama["Klasifikasi"].astype(str), pie_lama["Jumlah"]))
+
+    tren, tren_lama = kubus.tren_bulanan(pilihan), tren_bulanan_lama(df, payment_cols)
+    assert tren["Bulan"].tolist() == tren_lama["Bulan"].tolist()
+    assert tren["Total Pembayaran"].tolist() == tren_lama["Total Pembayaran"].tolist()
+
+    top, top_lama = kubus.top_objek(pilihan, 5), top_objek_lama(df, 5)
+    kunci = ["Nama Op", "Nm Unit", "KLASIFIKASI", "Total Pembayaran"]
+    assert top[kunci].astype(str).values.tolist() == top_lama[kunci].astype(str).values.tolist()
+
+
+def test_gabung_sama_dengan_kubus_penuh(hasil):
+    # Kubus per potongan (jalur streaming/partisi) digabung sama dengan kubus sekali jalan
+    df_output, payment_cols = hasil
+    penuh = KubusRingkasan(df_output, payment_cols)
+    gabung = KubusRingkasan.gabung([KubusRingkasan(df_output.iloc[i:i + 700], payment_cols)
+                                    for i in range(0, len(df_output), 700)])
+    for pilihan in PILIHAN:
+        pd.testing.assert_frame_equal(gabung.data_pie(pilihan), penuh.data_pie(pilihan))
+        pd.testing.assert_frame_equal(gabung.tren_bulanan(pilihan), penuh.tren_bulanan(pilihan))
+        pd.testing.assert_frame_equal(gabung.top_objek(pilihan, 5), penuh.top_objek(pilihan, 5), check_dtype=False,
+                                      check_categorical=False)
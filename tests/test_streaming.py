@@ -0,0 +1,38 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from conftest import buat_frame, buat_workbook
+from kepatuhan.hitung import hitung_kepatuhan
+from kepatuhan.streaming import muat_streaming
+
+
+def test_sama_dengan_baca_penuh():
+    df = buat_frame(rows=120, tahun=(2024,))
+    data = buat_workbook({"Data": df})
+    df_ringkas, payment_cols, kubus = muat_streaming(BytesIO(data), "Data", 2024, ukuran_chunk=50)
+    penuh, cols_penuh = hitung_kepatuhan(df.copy(), 2024)
+
+    assert payment_cols == cols_penuh
+    assert df_ringkas["Klasifikasi Kepatuhan"].astype(str).tolist() == \
+        penuh["Klasifikasi Kepatuhan"].astype(str).tolist()
+    assert df_ringkas["Total Pembayaran"].tolist() == penuh["Total Pembayaran"].tolist()
+    assert kubus.data_pie({})["Jumlah"].sum() == len(df)
+
+
+def test_sheet_hanya_header():
+    data = buat_workbook({"Data": buat_frame(rows=5, tahun=(2024,)).iloc[:0]})
+    df_ringkas, payment_cols, kubus = muat_streaming(BytesIO(data), "Data", 2024)
+    assert df_ringkas.empty
+    assert {"Klasifikasi Kepatuhan", "Total Pembayaran", "Nm Unit"} <= set(df_ringkas.columns)
+    assert len(payment_cols) == 12
+    assert kubus.data_pie({}).empty
+
+
+@pytest.mark.parametrize("sheet", [pd.DataFrame({"Keterangan": []}), pd.DataFrame({"Keterangan": ["rekap"]}),
+                                   pd.DataFrame()])
+def test_kolom_wajib_diperiksa_dari_header(sheet):
+    data = buat_workbook({"Data": sheet})
+    with pytest.raises(ValueError, match="Kolom wajib hilang"):
+        muat_streaming(BytesIO(data), "Data", 2024)
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from kepatuhan.tabel import TabelHalaman
+
+
+def test_urut_kolom_campuran_angka_dan_teks():
+    df = pd.DataFrame({"Nama Op": ["a", "b", "c", "d", "e"],
+                       "NOP": pd.Series([12, "3A", None, 5, "10"], dtype=object)})
+    tabel = TabelHalaman(df)
+    # Sebagai teks: "10" < "12" < "3A" < "5"; kosong selalu di akhir
+    assert tabel.urutan("NOP").tolist() == [4, 0, 1, 3, 2]
+    assert tabel.urutan("NOP", naik=False).tolist() == [3, 1, 0, 4, 2]
+
+
+def test_urut_angka_tetap_numerik():
+    df = pd.DataFrame({"Nama Op": list("abcd"), "Total": [10, 9, np.nan, 100]})
+    assert TabelHalaman(df).urutan("Total").tolist() == [1, 0, 3, 2]
+
+
+def test_susun_dengan_filter_cari_dan_urut():
+    df = pd.DataFrame({"Nama Op": pd.Categorical(["Hotel A", "Resto B", "hotel c", None]),
+                       "NOP": pd.Series(["x9", 1, 2, "x1"], dtype=object)})
+    tabel = TabelHalaman(df)
+    susunan = tabel.susun(np.array([0, 1, 2]), ("f",), "NOP", False, "HOTEL")
+    assert susunan.tolist() == [0, 2]